@@ -0,0 +1,166 @@
+"""
+Benchmark: replay recorded agent turns offline.
+
+Re-runs each turn of a trace recorded with AGENT_RECORD_PATH (see
+src/agent/recording.py) through run_agent, with the recorded Cohere
+responses substituted for the live client. The tools execute for real
+against a local database, so the run measures everything but the model:
+tool handlers, queries and the agent loop itself. Reports per-turn latency
+percentiles, recorded vs. replayed, and per-tool timings.
+
+A turn regresses when the replayed agent makes a different number of Cohere
+calls or returns a different response. Tool outputs that differ from the
+recording are counted separately: they depend on the database contents, so
+seed the database with the recorded user's data (--seed USER_ID=EXPORT,
+an NDJSON export from GET /api/{user_id}/export) for a like-for-like run.
+
+Usage (from backend/):
+    python -m benchmarks.agent_replay TRACE.jsonl [--limit N] [--repeat 3]
+        [--seed USER_ID=EXPORT.ndjson] [--simulate-llm-latency]
+        [--output REPLAY.jsonl] [--strict]
+
+Uses a temporary SQLite database unless BENCH_DATABASE_URL is set.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def to_messages(turn: dict) -> list[dict]:
+    """The run_agent input for a recorded turn: its chat history plus the user message."""
+    roles = {"USER": "user", "CHATBOT": "assistant"}
+    messages = [{"role": roles[entry["role"]], "content": entry["message"]} for entry in turn["chat_history"]]
+    return messages + [{"role": "user", "content": turn["message"]}]
+
+
+async def seed_user(user_id: str, path: str) -> dict:
+    from src.db.transfer import import_ndjson
+
+    async def chunks():
+        with open(path, "rb") as f:
+            while chunk := f.read(64 * 1024):
+                yield chunk
+
+    return await import_ndjson(user_id, chunks())
+
+
+async def replay(turns: list[dict], simulate_latency: bool) -> list[tuple[float, str]]:
+    """Run each turn under a ReplayClient; return (ms, response) per turn."""
+    from src.agent import run_agent, use_client, ReplayClient
+
+    results = []
+    for turn in turns:
+        with use_client(ReplayClient(turn, simulate_latency)):
+            started = time.perf_counter()
+            response, _ = await run_agent(to_messages(turn))
+            results.append(((time.perf_counter() - started) * 1000, response))
+    return results
+
+
+def compare(recorded: dict, replayed: dict) -> tuple[list[str], int]:
+    """Regressions of a replayed turn against its recording, and the number of differing tool outputs."""
+    regressions = []
+    if replayed["error"]:
+        regressions.append(f"error: {replayed['error']}")
+    if len(replayed["steps"]) != len(recorded["steps"]):
+        regressions.append(f"{len(replayed['steps'])} Cohere calls, recorded {len(recorded['steps'])}")
+    if replayed["response"] != recorded["response"]:
+        regressions.append("different response")
+    differing = sum(
+        a["name"] != b["name"] or a["outputs"] != b["outputs"]
+        for a, b in zip(recorded["tools"], replayed["tools"])
+    ) + abs(len(recorded["tools"]) - len(replayed["tools"]))
+    return regressions, differing
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("trace", help="JSONL file recorded with AGENT_RECORD_PATH")
+    parser.add_argument("--limit", type=int, help="replay only the first N turns")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the trace this many times")
+    parser.add_argument("--seed", action="append", default=[], metavar="USER_ID=EXPORT",
+                        help="import an NDJSON export for a user before replaying (repeatable)")
+    parser.add_argument("--simulate-llm-latency", action="store_true",
+                        help="sleep for each Cohere call's recorded duration")
+    parser.add_argument("--output", help="write the replayed turns here (default: a temporary file)")
+    parser.add_argument("--strict", action="store_true", help="exit with status 1 on any regression")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    output = args.output or os.path.join(tmpdir, "replay.jsonl")
+    os.environ["DATABASE_URL"] = os.getenv(
+        "BENCH_DATABASE_URL", f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    )
+    os.environ.pop("DATABASE_URLS", None)
+    os.environ.setdefault("COHERE_API_KEY", "bench-not-used")
+    # The replayed turns are recorded too, for the per-tool timings and the comparison
+    os.environ["AGENT_RECORD_PATH"] = output
+    os.environ["AGENT_RECORD_SAMPLE_RATE"] = "1"
+    if os.path.exists(output):
+        os.remove(output)
+
+    from src.agent import load_turns
+    from src.db.session import create_db_and_tables
+
+    turns = list(load_turns(args.trace))[:args.limit]
+    if not turns:
+        sys.exit(f"No turns in {args.trace}")
+
+    create_db_and_tables()
+    for spec in args.seed:
+        user_id, path = spec.split("=", 1)
+        print(f"Seeded {user_id}: {asyncio.run(seed_user(user_id, path))}")
+
+    latencies = []
+    for _ in range(args.repeat):
+        latencies += [ms for ms, _ in asyncio.run(replay(turns, args.simulate_llm_latency))]
+
+    replayed = list(load_turns(output))
+    regressions, differing_outputs = 0, 0
+    for index, (recorded, result) in enumerate(zip(turns * args.repeat, replayed)):
+        problems, differing = compare(recorded, result)
+        differing_outputs += differing
+        if problems:
+            regressions += 1
+            print(f"turn {index % len(turns)} ({recorded['message'][:40]!r}): {'; '.join(problems)}")
+
+    recorded_ms = [turn["total_ms"] for turn in turns]
+    llm_ms = [sum(step["llm_ms"] for step in turn["steps"]) for turn in turns]
+    print(f"\n{len(turns)} turns x {args.repeat}: {regressions} regressions, "
+          f"{differing_outputs} tool outputs differ from the recording")
+    print(f"{'':<26}{'p50':>9}{'p95':>9}{'max':>9}")
+    for label, values in (("recorded total (ms)", recorded_ms),
+                          ("recorded Cohere (ms)", llm_ms),
+                          ("replayed total (ms)", latencies)):
+        print(f"{label:<26}{percentile(values, 50):9.1f}{percentile(values, 95):9.1f}{max(values):9.1f}")
+
+    tools = defaultdict(lambda: {"recorded": [], "replayed": []})
+    for source, records in (("recorded", turns), ("replayed", replayed)):
+        for turn in records:
+            for call in turn["tools"]:
+                tools[call["name"]][source].append(call["ms"])
+    if tools:
+        print(f"\n{'tool':<16}{'calls':>7}{'recorded p50':>14}{'replayed p50':>14}")
+        for name, timings in sorted(tools.items()):
+            recorded_p50 = statistics.median(timings["recorded"]) if timings["recorded"] else float("nan")
+            replayed_p50 = statistics.median(timings["replayed"]) if timings["replayed"] else float("nan")
+            print(f"{name:<16}{len(timings['replayed']):>7}{recorded_p50:14.2f}{replayed_p50:14.2f}")
+    print(f"\nReplayed turns written to {output}")
+
+    if args.strict and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: streaming NDJSON export/import throughput and memory.
+
+Seeds a fixture of N rows (default 1M: 10% tasks, 2% conversations, the rest
+messages) for one user, exports it to a file through the streaming export,
+then imports that file into a second user. Reports rows/sec and, with
+--memory, the Python heap peak (tracemalloc) of each phase, which stays
+flat as N grows.
+
+Usage (from backend/):
+    python -m benchmarks.export_import_bench [--rows 1000000] [--memory]
+
+Uses a temporary SQLite database unless BENCH_DATABASE_URL is set.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+CHUNK_SIZE = 64 * 1024
+
+
+def seed(engine, user_id: str, rows: int, rng: random.Random) -> None:
+    """Bulk-insert the fixture with multi-row inserts."""
+    from sqlalchemy import insert
+    from datetime import datetime
+    from src.db.models import Task, Conversation, Message, MessageRole
+
+    now = datetime.utcnow()
+    tasks = rows // 10
+    conversations = max(1, rows // 50)
+    messages = rows - tasks - conversations
+
+    with engine.begin() as conn:
+        for start in range(0, tasks, 5000):
+            conn.execute(insert(Task), [
+                {"user_id": user_id, "title": f"task {i}", "description": "x" * rng.randint(0, 200),
+                 "completed": False, "created_at": now, "updated_at": now}
+                for i in range(start, min(start + 5000, tasks))
+            ])
+        conn.execute(insert(Conversation), [
+            {"user_id": user_id, "created_at": now, "updated_at": now, "message_count": 0}
+            for _ in range(conversations)
+        ])
+        first_id = conn.exec_driver_sql("SELECT MIN(id) FROM conversation").scalar()
+        for start in range(0, messages, 5000):
+            conn.execute(insert(Message), [
+                {"conversation_id": first_id + i % conversations, "user_id": user_id,
+                 "role": MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT,
+                 "content": "y" * rng.randint(10, 400), "created_at": now}
+                for i in range(start, min(start + 5000, messages))
+            ])
+
+
+async def read_chunks(path: str):
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+def measure(label: str, rows: int, fn, trace_memory: bool):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    line = f"{label:<7} {rows:>9} rows  {elapsed:7.1f}s  {rows / elapsed:10.0f} rows/s"
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += f"  peak heap {peak / 2**20:6.1f} MiB"
+    print(line)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--memory", action="store_true",
+                        help="trace heap peak with tracemalloc (slows both phases)")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = os.getenv(
+        "BENCH_DATABASE_URL", f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    )
+
+    from src.db.session import get_engine, create_db_and_tables
+    from src.db.transfer import iter_export, import_ndjson
+
+    create_db_and_tables()
+    rng = random.Random(args.seed)
+    source, target = f"bench-{args.seed}", f"bench-{args.seed}-import"
+
+    start = time.perf_counter()
+    seed(get_engine(source), source, args.rows, rng)
+    print(f"Seeded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+    path = os.path.join(tmpdir, "export.ndjson")
+
+    def export():
+        with open(path, "wb") as f:
+            for chunk in iter_export(source):
+                f.write(chunk)
+
+    measure("export", args.rows, export, args.memory)
+    print(f"Export size: {os.path.getsize(path) / 2**20:.1f} MiB")
+    result = measure(
+        "import", args.rows,
+        lambda: asyncio.run(import_ndjson(target, read_chunks(path))),
+        args.memory
+    )
+    print(f"Imported: {result['task']} tasks, {result['conversation']} conversations, {result['message']} messages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: indexed search_tasks vs. in-process scan.
+
+Seeds N tasks (default 100k) for one user and times the same queries through
+the full-text index (tsvector/GIN on PostgreSQL, FTS5 on SQLite) and through
+the scan fallback that loads and ranks every task in Python.
+
+Usage (from backend/):
+    python -m benchmarks.search_tasks_bench [--tasks 100000] [--queries 50]
+
+Uses a temporary SQLite database unless BENCH_DATABASE_URL is set.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+
+WORDS = (
+    "report meeting dentist invoice groceries milk budget review draft email "
+    "call plan trip flight hotel car insurance renew passport gym doctor "
+    "birthday gift party cleanup garden paint repair laptop backup taxes "
+    "receipt contract client project deadline slides notes research book"
+).split()
+# Long tail of rarer terms with a Zipf-like distribution, as in real text
+VOCABULARY = WORDS + [f"term{i}" for i in range(5000)]
+CUM_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=words))
+
+
+def seed(engine, user_id: str, count: int, rng: random.Random) -> None:
+    """Bulk-insert tasks with random titles and long descriptions."""
+    from sqlalchemy import insert
+    from datetime import datetime
+    from src.db.models import Task
+
+    now = datetime.utcnow()
+    batch = []
+    with engine.begin() as conn:
+        for i in range(count):
+            batch.append({
+                "user_id": user_id,
+                "title": sentence(rng, rng.randint(2, 5)),
+                "description": sentence(rng, rng.randint(10, 60)),
+                "completed": rng.random() < 0.3,
+                "created_at": now,
+                "updated_at": now,
+            })
+            if len(batch) == 5000:
+                conn.execute(insert(Task), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Task), batch)
+
+
+def timed(fn, queries: list[str]) -> list[float]:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<10} mean {statistics.mean(samples):8.2f} ms   p50 {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = os.getenv(
+        "BENCH_DATABASE_URL", f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    )
+
+    from sqlmodel import SQLModel, Session
+    from src.db.session import get_engine
+    from src.db.search import setup_search, fulltext_backend
+    from src.mcp.tools.search_tasks import search_tasks_handler, scan_search
+
+    rng = random.Random(args.seed)
+    user_id = f"bench-{args.seed}"
+    engine = get_engine(user_id)
+
+    SQLModel.metadata.create_all(engine)
+    start = time.perf_counter()
+    seed(engine, user_id, args.tasks, rng)
+    # Index after seeding so the FTS5 backfill covers the bulk insert
+    setup_search(engine)
+    print(f"Seeded {args.tasks} tasks in {time.perf_counter() - start:.1f}s")
+
+    queries = [sentence(rng, rng.randint(1, 2)) for _ in range(args.queries)]
+
+    def indexed(query: str):
+        return asyncio.run(search_tasks_handler(user_id, query, limit=10))
+
+    def scan(query: str):
+        with Session(engine) as session:
+            return scan_search(session, user_id, query, None, 11, 0)
+
+    with Session(engine) as session:
+        print(f"Backend: {fulltext_backend(session)} ({engine.dialect.name})")
+
+    report("indexed", timed(indexed, queries))
+    report("scan", timed(scan, queries))
+
+
+if __name__ == "__main__":
+    main()
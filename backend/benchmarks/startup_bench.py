@@ -0,0 +1,174 @@
+"""
+Benchmark: cold start of the API.
+
+Each run starts a fresh interpreter and measures:
+- import: cumulative time to import src.main, from `python -X importtime`
+- health: process start to the first successful GET /health under uvicorn
+- first DB request: process start to the first successful
+  GET /api/{user_id}/conversations (includes engine creation and connect)
+
+Reports the median of --runs runs and the slowest imports of the last run.
+With --baseline-ref, the same measurements are taken on a git checkout of
+that ref (e.g. the commit before a startup change) for comparison.
+
+Usage (from backend/):
+    python -m benchmarks.startup_bench [--runs 5] [--baseline-ref REF]
+
+Uses a temporary SQLite database unless BENCH_DATABASE_URL is set.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUEST_TIMEOUT_SECONDS = 30
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """Parse `-X importtime` output into (module, self us, cumulative us) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_import(cwd: str, env: dict) -> tuple[float, list[tuple[str, int, int]]]:
+    """Import src.main in a fresh interpreter; return (ms, importtime rows)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True
+    )
+    rows = parse_importtime(result.stderr)
+    total = next(cumulative for module, _, cumulative in rows if module.strip() == "src.main")
+    return total / 1000, rows
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, started: float, server: subprocess.Popen) -> float:
+    """Poll url until it answers 200; return ms since `started`."""
+    deadline = started + REQUEST_TIMEOUT_SECONDS
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode} before {url} succeeded")
+        try:
+            with urllib.request.urlopen(url, timeout=REQUEST_TIMEOUT_SECONDS) as response:
+                if response.status == 200:
+                    return (time.perf_counter() - started) * 1000
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.005)
+    raise TimeoutError(f"No successful response from {url} within {REQUEST_TIMEOUT_SECONDS}s")
+
+
+def measure_first_requests(cwd: str, env: dict) -> tuple[float, float]:
+    """Start uvicorn; return ms to the first /health and first DB-backed response."""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=cwd, env=env
+    )
+    try:
+        health = wait_for(f"http://127.0.0.1:{port}/health", started, server)
+        first_db = wait_for(f"http://127.0.0.1:{port}/api/bench-user/conversations", started, server)
+    finally:
+        server.terminate()
+        server.wait()
+    return health, first_db
+
+
+def prepare_schema(cwd: str, env: dict) -> None:
+    """Create tables up front when the tree has a schema command; older trees do it on startup."""
+    if os.path.exists(os.path.join(cwd, "src", "db", "init_db.py")):
+        subprocess.run([sys.executable, "-m", "src.db.init_db"], cwd=cwd, env=env,
+                       check=True, capture_output=True)
+
+
+def run(label: str, cwd: str, database_url: str, runs: int) -> tuple[dict, list]:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    env.pop("DATABASE_URLS", None)
+    env.setdefault("COHERE_API_KEY", "bench-not-used")
+    prepare_schema(cwd, env)
+
+    imports, healths, first_dbs = [], [], []
+    rows = []
+    for _ in range(runs):
+        import_ms, rows = measure_import(cwd, env)
+        health_ms, first_db_ms = measure_first_requests(cwd, env)
+        imports.append(import_ms)
+        healths.append(health_ms)
+        first_dbs.append(first_db_ms)
+
+    result = {
+        "import": statistics.median(imports),
+        "health": statistics.median(healths),
+        "first DB request": statistics.median(first_dbs)
+    }
+    print(f"{label}: " + "  ".join(f"{name} {ms:7.0f} ms" for name, ms in result.items()))
+    return result, rows
+
+
+def _git_root() -> str:
+    return subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=BACKEND_DIR,
+                          capture_output=True, text=True, check=True).stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--baseline-ref", metavar="REF",
+                        help="git ref to measure as the baseline, e.g. HEAD~1")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+
+    def database_url(name: str) -> str:
+        return os.getenv("BENCH_DATABASE_URL", f"sqlite:///{os.path.join(tmpdir, name)}")
+
+    results = {}
+    if args.baseline_ref:
+        worktree = os.path.join(tmpdir, "baseline")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, args.baseline_ref],
+                       cwd=BACKEND_DIR, check=True, capture_output=True)
+        try:
+            baseline_dir = os.path.join(worktree, os.path.relpath(BACKEND_DIR, _git_root()))
+            results["baseline"], _ = run(
+                f"baseline ({args.baseline_ref})", baseline_dir, database_url("baseline.db"), args.runs
+            )
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree],
+                           cwd=BACKEND_DIR, check=True, capture_output=True)
+
+    results["current"], rows = run("current", BACKEND_DIR, database_url("current.db"), args.runs)
+
+    if "baseline" in results:
+        print("change:   " + "  ".join(
+            f"{name} {results['current'][name] - baseline:+7.0f} ms"
+            for name, baseline in results["baseline"].items()
+        ))
+
+    # Top-level modules and their direct imports (importtime indents 2 per level)
+    top_level = [row for row in rows if len(row[0]) - len(row[0].lstrip()) <= 3]
+    print("\nSlowest imports (cumulative, last run):")
+    for module, _, cumulative in sorted(top_level, key=lambda row: -row[2])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {module.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,5 @@
 """Source package initialization"""
+from dotenv import load_dotenv
+
+# Load .env once for the app and every command-line entry point
+load_dotenv()
@@ -1,12 +1,23 @@
 """Agent package initialization"""
-from .config import client, AGENT_INSTRUCTIONS, TOOLS, get_agent_config
-from .runner import run_agent, execute_tool_call
+from .config import get_client, use_client, AGENT_INSTRUCTIONS, TOOLS, get_agent_config
+from .runner import run_agent, run_agent_stream, to_chat_history, execute_tool_call
+from .recording import record_turn, ReplayClient, ReplayExhausted, load_turns
+from .run_state import AgentRun, agent_metrics
 
 __all__ = [
-    "client",
+    "get_client",
+    "use_client",
     "AGENT_INSTRUCTIONS",
     "TOOLS",
     "get_agent_config",
     "run_agent",
+    "run_agent_stream",
+    "to_chat_history",
     "execute_tool_call",
+    "record_turn",
+    "ReplayClient",
+    "ReplayExhausted",
+    "load_turns",
+    "AgentRun",
+    "agent_metrics",
 ]
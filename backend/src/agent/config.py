@@ -15,20 +15,46 @@ Configuration Requirements (Section 8.5):
 - Do not store memory in the agent
 """
 
-import cohere
 import os
-from dotenv import load_dotenv
 import json
+from contextlib import contextmanager
+from contextvars import ContextVar
 
-load_dotenv()
+_client = None
+# Client substituted for the current context, e.g. by agent turn replay
+_client_override: ContextVar = ContextVar("agent_client_override", default=None)
 
-# Initialize Cohere client
-api_key = os.getenv("COHERE_API_KEY")
-if not api_key:
-    # Fallback to OpenAI key if user put cohere key in there by mistake or explicitly ask
-    print("Warning: COHERE_API_KEY not found. Please set it in .env")
 
-client = cohere.Client(api_key=api_key)
+def get_client():
+    """
+    Get the Cohere client, creating it on first use.
+    Building it loads the SDK's HTTP stack, the largest single cost of
+    importing the app, so it is kept off the cold-start path.
+    """
+    override = _client_override.get()
+    if override is not None:
+        return override
+    
+    global _client
+    if _client is None:
+        import cohere
+        
+        api_key = os.getenv("COHERE_API_KEY")
+        if not api_key:
+            print("Warning: COHERE_API_KEY not found. Please set it in .env")
+        
+        _client = cohere.Client(api_key=api_key)
+    return _client
+
+
+@contextmanager
+def use_client(client):
+    """Make get_client() return `client` within this context (used by replay)."""
+    token = _client_override.set(client)
+    try:
+        yield client
+    finally:
+        _client_override.reset(token)
 
 # Agent system instructions
 AGENT_INSTRUCTIONS = """
@@ -47,6 +73,11 @@ AVAILABLE OPERATIONS:
 - Complete tasks: Use complete_task tool (triggers: done/complete/finished)
 - Delete tasks: Use delete_task tool (triggers: delete/remove/cancel)
 - Update tasks: Use update_task tool (triggers: update/change/rename)
+- Find tasks: Use find_task tool to resolve a task mentioned by name to its ID
+- Search tasks: Use search_tasks tool (triggers: search/find/look for)
+
+When the user refers to a task by name instead of ID, pass it as task_title to
+complete_task, delete_task or update_task rather than listing all tasks first.
 """
 
 # Cohere-formatted tools (List of dicts)
@@ -98,9 +129,14 @@ TOOLS = [
                 "required": True
             },
             "task_id": {
-                "description": "The ID of the task to complete",
+                "description": "The ID of the task to complete (or use task_title)",
                 "type": "int",
-                "required": True
+                "required": False
+            },
+            "task_title": {
+                "description": "Name of the task to complete when the ID is not known, e.g. 'dentist'",
+                "type": "str",
+                "required": False
             }
         }
     },
@@ -114,9 +150,14 @@ TOOLS = [
                 "required": True
             },
             "task_id": {
-                "description": "The ID of the task to delete",
+                "description": "The ID of the task to delete (or use task_title)",
                 "type": "int",
-                "required": True
+                "required": False
+            },
+            "task_title": {
+                "description": "Name of the task to delete when the ID is not known, e.g. 'dentist'",
+                "type": "str",
+                "required": False
             }
         }
     },
@@ -130,9 +171,14 @@ TOOLS = [
                 "required": True
             },
             "task_id": {
-                "description": "The ID of the task to update",
+                "description": "The ID of the task to update (or use task_title)",
                 "type": "int",
-                "required": True
+                "required": False
+            },
+            "task_title": {
+                "description": "Name of the task to update when the ID is not known, e.g. 'dentist'",
+                "type": "str",
+                "required": False
             },
             "title": {
                 "description": "New title for the task (optional)",
@@ -145,6 +191,58 @@ TOOLS = [
                 "required": False
             }
         }
+    },
+    {
+        "name": "find_task",
+        "description": "Find the user's tasks matching a name or phrase, ranked by similarity. Use when a task is referred to by name.",
+        "parameter_definitions": {
+            "user_id": {
+                "description": "The ID of the user",
+                "type": "str",
+                "required": True
+            },
+            "query": {
+                "description": "Words from the task title or description, e.g. 'dentist'",
+                "type": "str",
+                "required": True
+            },
+            "limit": {
+                "description": "Maximum number of candidates to return (default 5)",
+                "type": "int",
+                "required": False
+            }
+        }
+    },
+    {
+        "name": "search_tasks",
+        "description": "Full-text search over task titles and descriptions, best matches first. Trigger words: search, find, look for.",
+        "parameter_definitions": {
+            "user_id": {
+                "description": "The ID of the user",
+                "type": "str",
+                "required": True
+            },
+            "query": {
+                "description": "Words to search for; every word must occur in the task",
+                "type": "str",
+                "required": True
+            },
+            "status": {
+                "description": "Optional filter: 'completed' for done tasks, 'pending' for active tasks",
+                "type": "str",
+                "required": False
+            },
+            "limit": {
+                "description": "Maximum number of results to return (default 10, max 50)",
+                "type": "int",
+                "required": False
+            },
+            "offset": {
+                "description": "Number of results to skip, from next_offset of a previous search",
+                "type": "int",
+                "required": False
+            }
+        }
     }
 ]
 
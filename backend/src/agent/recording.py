@@ -0,0 +1,209 @@
+"""
+Agent turn recording and replay.
+
+Recording is opt-in: set AGENT_RECORD_PATH to a JSONL file (and optionally
+AGENT_RECORD_SAMPLE_RATE) and every agent turn appends one line:
+
+    {"version": 1, "recorded_at", "model", "message", "chat_history",
+     "steps": [{"message", "tool_results", "response": {"text", "tool_calls",
+                "finish_reason"}, "llm_ms", "first_token_ms"}],
+     "tools": [{"name", "arguments", "outputs", "ms", "memoized"}],
+     "response", "error", "total_ms"}
+
+`steps` holds one entry per Cohere call: the initial prediction and each
+continuation with tool results. `tools` holds every tool call, in order,
+including reads answered from the run's memo (see run_state.py).
+
+ReplayClient stands in for the Cohere client and returns a recorded turn's
+responses in order, so a turn can be re-run offline without network access
+or model nondeterminism. Tools still execute against whatever database is
+configured. See benchmarks/agent_replay.py.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Iterator, Optional
+
+from .config import get_client
+
+logger = logging.getLogger(__name__)
+
+AGENT_RECORD_PATH = os.getenv("AGENT_RECORD_PATH")
+AGENT_RECORD_SAMPLE_RATE = float(os.getenv("AGENT_RECORD_SAMPLE_RATE", "1"))
+RECORD_FORMAT_VERSION = 1
+
+_write_lock = threading.Lock()
+
+
+def _tool_call_data(tool_call) -> dict:
+    return {"name": tool_call.name, "parameters": tool_call.parameters}
+
+
+def _response_data(response) -> dict:
+    return {
+        "text": response.text,
+        "tool_calls": [_tool_call_data(call) for call in response.tool_calls] if response.tool_calls else None,
+        "finish_reason": getattr(response, "finish_reason", None)
+    }
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+class TurnRecord:
+    """Everything sent to and received from Cohere and the tools during one agent turn."""
+
+    def __init__(self, message: str, chat_history: list[dict], model: str):
+        self.started = time.perf_counter()
+        self.data = {
+            "version": RECORD_FORMAT_VERSION,
+            "recorded_at": datetime.utcnow().isoformat(),
+            "model": model,
+            "message": message,
+            "chat_history": chat_history,
+            "steps": [],
+            "tools": [],
+            "response": None,
+            "error": None,
+            "total_ms": None
+        }
+
+    def llm_step(self, request: dict, response, llm_ms: float, first_token_ms: Optional[float] = None) -> None:
+        self.data["steps"].append({
+            "message": request.get("message"),
+            "tool_results": [
+                {"call": _tool_call_data(result["call"]), "outputs": result["outputs"]}
+                for result in request.get("tool_results") or []
+            ] or None,
+            "response": _response_data(response),
+            "llm_ms": llm_ms,
+            "first_token_ms": first_token_ms
+        })
+
+    def tool_call(self, name: str, arguments: dict, outputs: list[dict], started: float, memoized: bool = False) -> None:
+        self.data["tools"].append({
+            "name": name, "arguments": arguments, "outputs": outputs,
+            "ms": _elapsed_ms(started), "memoized": memoized
+        })
+
+    def finish(self, response: str, error: Optional[str] = None) -> None:
+        self.data["response"] = response
+        self.data["error"] = error
+
+
+@contextmanager
+def record_turn(message: str, chat_history: list[dict], model: str) -> Iterator[Optional[TurnRecord]]:
+    """
+    Record this turn to AGENT_RECORD_PATH if recording is enabled and the
+    turn is sampled. Yields the TurnRecord, or None when not recording.
+    """
+    if not AGENT_RECORD_PATH or random.random() >= AGENT_RECORD_SAMPLE_RATE:
+        yield None
+        return
+
+    turn = TurnRecord(message, chat_history, model)
+    try:
+        yield turn
+    finally:
+        turn.data["total_ms"] = _elapsed_ms(turn.started)
+        try:
+            line = json.dumps(turn.data, default=str)
+            with _write_lock, open(AGENT_RECORD_PATH, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except Exception as e:
+            logger.error(f"Failed to record agent turn: {e}")
+
+
+class RecordingClient:
+    """Wraps the Cohere client and records each call's request, response and timing."""
+
+    def __init__(self, client, turn: TurnRecord):
+        self.client = client
+        self.turn = turn
+
+    def chat(self, **kwargs):
+        started = time.perf_counter()
+        response = self.client.chat(**kwargs)
+        self.turn.llm_step(kwargs, response, _elapsed_ms(started))
+        return response
+
+    def chat_stream(self, **kwargs):
+        started = time.perf_counter()
+        first_token_ms = None
+        for event in self.client.chat_stream(**kwargs):
+            if event.event_type == "text-generation" and first_token_ms is None:
+                first_token_ms = _elapsed_ms(started)
+            elif event.event_type == "stream-end":
+                self.turn.llm_step(kwargs, event.response, _elapsed_ms(started), first_token_ms)
+            yield event
+
+
+def agent_client(turn: Optional[TurnRecord]):
+    """The Cohere client for a turn, wrapped to record its calls when the turn is recorded."""
+    client = get_client()
+    return RecordingClient(client, turn) if turn is not None else client
+
+
+class ReplayExhausted(RuntimeError):
+    """The agent made more Cohere calls than the recorded turn contains."""
+
+
+class ReplayClient:
+    """
+    Cohere client stand-in that returns a recorded turn's responses in order.
+    With simulate_latency, each call sleeps for its recorded duration.
+    """
+
+    def __init__(self, turn: dict, simulate_latency: bool = False):
+        self.steps = turn["steps"]
+        self.simulate_latency = simulate_latency
+        self.calls = 0
+
+    def _next_step(self) -> dict:
+        if self.calls >= len(self.steps):
+            raise ReplayExhausted(f"Recorded turn has only {len(self.steps)} Cohere calls")
+        step = self.steps[self.calls]
+        self.calls += 1
+        if self.simulate_latency:
+            time.sleep(step["llm_ms"] / 1000)
+        return step
+
+    @staticmethod
+    def _response(data: dict):
+        return SimpleNamespace(
+            text=data["text"],
+            tool_calls=[
+                SimpleNamespace(name=call["name"], parameters=call["parameters"])
+                for call in data["tool_calls"]
+            ] if data["tool_calls"] else None,
+            finish_reason=data.get("finish_reason")
+        )
+
+    def chat(self, **kwargs):
+        return self._response(self._next_step()["response"])
+
+    def chat_stream(self, **kwargs):
+        response = self._response(self._next_step()["response"])
+        if response.text:
+            yield SimpleNamespace(event_type="text-generation", text=response.text)
+        yield SimpleNamespace(event_type="stream-end", response=response)
+
+
+def load_turns(path: str) -> Iterator[dict]:
+    """Read recorded turns from a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            turn = json.loads(line)
+            if turn.get("version") != RECORD_FORMAT_VERSION:
+                raise ValueError(f"Line {line_number}: unsupported record version {turn.get('version')}")
+            yield turn
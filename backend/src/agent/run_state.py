@@ -0,0 +1,125 @@
+"""
+Per-run state of the agent loop: tool result memoization and budgets.
+
+Within one run the model often repeats an identical read, e.g. list_tasks
+with the same status on consecutive steps. Results of READ_ONLY_TOOLS are
+memoized per run, keyed by tool name and arguments, and the memo is
+cleared whenever any other (mutating) tool runs, so a read after a write
+always sees the write. Error outputs are not memoized.
+
+Each run may take at most AGENT_MAX_STEPS rounds of tool calls and
+AGENT_MAX_SECONDS of wall-clock time, checked before each round. When
+either budget is exhausted the pending tool calls are answered with an
+error output instead of being executed, and Cohere is asked for a final
+single-step answer.
+
+agent_metrics counts runs, tool calls, memo hits and exhausted budgets for
+GET /debug/agent.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+AGENT_MAX_STEPS = int(os.getenv("AGENT_MAX_STEPS", "6"))
+AGENT_MAX_SECONDS = float(os.getenv("AGENT_MAX_SECONDS", "45"))
+
+# Tools without side effects, whose results can be reused within a run
+READ_ONLY_TOOLS = frozenset({"list_tasks", "find_task", "search_tasks"})
+
+# Reply when even the forced final answer has no text
+BUDGET_EXHAUSTED_REPLY = (
+    "I wasn't able to finish that request in one go. "
+    "Could you try again, or break it into smaller steps?"
+)
+
+
+class AgentMetrics:
+    """Process-wide counters over all agent runs."""
+
+    def __init__(self):
+        self.counts = {
+            "runs": 0,
+            "tool_calls": 0,
+            "memo_hits": 0,
+            "memo_invalidations": 0,
+            "step_budget_exhausted": 0,
+            "time_budget_exhausted": 0
+        }
+        self._lock = threading.Lock()
+
+    def increment(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.counts, "max_steps": AGENT_MAX_STEPS, "max_seconds": AGENT_MAX_SECONDS}
+
+
+agent_metrics = AgentMetrics()
+
+
+class AgentRun:
+    """Memo and budget of a single run_agent / run_agent_stream invocation."""
+
+    def __init__(self, max_steps: Optional[int] = None, max_seconds: Optional[float] = None):
+        self.max_steps = AGENT_MAX_STEPS if max_steps is None else max_steps
+        self.max_seconds = AGENT_MAX_SECONDS if max_seconds is None else max_seconds
+        self.started = time.perf_counter()
+        self.steps = 0
+        self.memo: dict[tuple[str, str], list[dict]] = {}
+        agent_metrics.increment("runs")
+
+    @staticmethod
+    def _key(tool_name: str, arguments: dict) -> tuple[str, str]:
+        return tool_name, json.dumps(arguments, sort_keys=True, default=str)
+
+    def cached(self, tool_name: str, arguments: dict) -> Optional[list[dict]]:
+        """Outputs of an identical earlier read in this run, if any."""
+        agent_metrics.increment("tool_calls")
+        if tool_name not in READ_ONLY_TOOLS:
+            return None
+        outputs = self.memo.get(self._key(tool_name, arguments))
+        if outputs is not None:
+            agent_metrics.increment("memo_hits")
+            logger.info(f"Reusing {tool_name} result from earlier in this run")
+        return outputs
+
+    def remember(self, tool_name: str, arguments: dict, outputs: list[dict]) -> None:
+        """Memoize a read, or drop all memoized reads after a mutating tool."""
+        if tool_name not in READ_ONLY_TOOLS:
+            if self.memo:
+                agent_metrics.increment("memo_invalidations")
+                self.memo.clear()
+        elif not any("error" in output for output in outputs):
+            self.memo[self._key(tool_name, arguments)] = outputs
+
+    def budget_exhausted(self) -> Optional[str]:
+        """Before a round of tool calls: the exhausted budget ("step" or "time"), if any."""
+        if self.steps >= self.max_steps:
+            reason = "step"
+        elif time.perf_counter() - self.started >= self.max_seconds:
+            reason = "time"
+        else:
+            return None
+        agent_metrics.increment(f"{reason}_budget_exhausted")
+        logger.warning(f"Agent run exhausted its {reason} budget after {self.steps} tool rounds")
+        return reason
+
+    @staticmethod
+    def budget_results(tool_calls, reason: str) -> list[dict]:
+        """Tool results that decline the pending calls, for the forced final answer."""
+        return [
+            {
+                "call": tool_call,
+                "outputs": [{"error": f"Not executed: the {reason} budget for this request is exhausted. "
+                                      "Answer with the information gathered so far."}]
+            }
+            for tool_call in tool_calls
+        ]
@@ -3,16 +3,24 @@ Cohere Agent Runner - handles tool invocation and response generation.
 Stateless per Section 2.2 - no memory stored in agent.
 """
 
+import asyncio
 import logging
 import json
-import cohere
-from .config import client, AGENT_INSTRUCTIONS, get_agent_config
+import threading
+import time
+from typing import AsyncIterator
+from .config import AGENT_INSTRUCTIONS, get_agent_config
+from .recording import record_turn, agent_client
+from .run_state import AgentRun, BUDGET_EXHAUSTED_REPLY
+from ..profiling import memory_profiler
 from ..mcp.tools import (
     add_task_handler,
     list_tasks_handler,
     complete_task_handler,
     delete_task_handler,
-    update_task_handler
+    update_task_handler,
+    find_task_handler,
+    search_tasks_handler
 )
 
 logger = logging.getLogger(__name__)
@@ -23,6 +31,11 @@ async def execute_tool_call(tool_name: str, arguments: dict) -> list[dict]:
     Execute MCP tool based on function call from agent.
     Returns the result formatted for Cohere tool outputs.
     """
+    with memory_profiler.profile("tool", tool_name):
+        return await _execute_tool_call(tool_name, arguments)
+
+
+async def _execute_tool_call(tool_name: str, arguments: dict) -> list[dict]:
     try:
         logger.info(f"Executing tool: {tool_name} with args: {arguments}")
         
@@ -46,6 +59,14 @@ async def execute_tool_call(tool_name: str, arguments: dict) -> list[dict]:
         elif tool_name == "update_task":
             result = await update_task_handler(**arguments)
             result_data = result.model_dump()
+        
+        elif tool_name == "find_task":
+            result = await find_task_handler(**arguments)
+            result_data = result.model_dump()
+        
+        elif tool_name == "search_tasks":
+            result = await search_tasks_handler(**arguments)
+            result_data = result.model_dump()
         else:
             result_data = {"error": f"Unknown tool: {tool_name}"}
             
@@ -56,37 +77,71 @@ async def execute_tool_call(tool_name: str, arguments: dict) -> list[dict]:
         return [{"error": str(e)}]
 
 
-async def run_agent(messages: list[dict]) -> tuple[str, list[dict]]:
+async def _run_tool(run: AgentRun, turn, tool_call) -> list[dict]:
+    """Execute one tool call of a run, reusing an identical earlier read."""
+    started = time.perf_counter()
+    outputs = run.cached(tool_call.name, tool_call.parameters)
+    memoized = outputs is not None
+    if not memoized:
+        outputs = await execute_tool_call(tool_call.name, tool_call.parameters)
+        run.remember(tool_call.name, tool_call.parameters, outputs)
+    if turn is not None:
+        turn.tool_call(tool_call.name, tool_call.parameters, outputs, started, memoized)
+    return outputs
+
+
+def to_chat_history(messages: list[dict]) -> list[dict]:
+    """Convert OpenAI-style messages to Cohere chat_history entries."""
+    chat_history = []
+    for msg in messages:
+        role = msg['role']
+        content = msg['content']
+        
+        if role == 'user':
+            chat_history.append({"role": "USER", "message": content})
+        elif role == 'assistant':
+            chat_history.append({"role": "CHATBOT", "message": content})
+        # System messages are passed in preamble, not history
+    return chat_history
+
+
+async def run_agent(messages: list[dict], raise_errors: bool = False) -> tuple[str, list[dict]]:
     """
     Run Cohere Agent with conversation history.
+    AI service errors are returned as the response text, or re-raised with
+    raise_errors=True for callers that report failures separately.
     """
     agent_config = get_agent_config()
     
-    # Convert OpenAI-style messages to Cohere chat_history
-    chat_history = []
-    message_input = ""
-    
     # The last message is the current user input
+    message_input = ""
     if messages and messages[-1]['role'] == 'user':
         message_input = messages[-1]['content']
         history_messages = messages[:-1]
     else:
         # Should not happen ideally, but handle gracefully
         history_messages = messages
-        
-    for msg in history_messages:
-        role = msg['role']
-        content = msg['content']
-        
-        if role == 'user':
-            chat_history.append({"role": "USER", "message": content})
-        elif role == 'assistant':
-            chat_history.append({"role": "CHATBOT", "message": content})
-        # System messages are passed in preamble, not history
-            
+    
+    # Convert OpenAI-style messages to Cohere chat_history
+    chat_history = to_chat_history(history_messages)
+    
+    with record_turn(message_input, chat_history, agent_config["model"]) as turn:
+        return await _run_agent(message_input, chat_history, agent_config, turn, raise_errors)
+
+
+async def _run_agent(
+    message_input: str,
+    chat_history: list[dict],
+    agent_config: dict,
+    turn,
+    raise_errors: bool
+) -> tuple[str, list[dict]]:
+    client = agent_client(turn)
+    run = AgentRun()
     try:
-        # Initial prediction
-        response = client.chat(
+        # Initial prediction; the SDK call blocks, so keep it off the event loop
+        response = await asyncio.to_thread(
+            client.chat,
             message=message_input,
             chat_history=chat_history,
             preamble=AGENT_INSTRUCTIONS,
@@ -97,14 +152,29 @@ async def run_agent(messages: list[dict]) -> tuple[str, list[dict]]:
         
         # Handle tool calls loop (multi-step capability)
         while response.tool_calls:
+            reason = run.budget_exhausted()
+            if reason:
+                # Decline the pending calls and ask for an answer from what we have
+                response = await asyncio.to_thread(
+                    client.chat,
+                    message="",
+                    chat_history=chat_history,
+                    tool_results=run.budget_results(response.tool_calls, reason),
+                    preamble=AGENT_INSTRUCTIONS,
+                    model=agent_config["model"],
+                    tools=agent_config["tools"],
+                    force_single_step=True
+                )
+                break
+            
             tool_results = []
             
             for tool_call in response.tool_calls:
                 header = f"Tool Call: {tool_call.name}"
                 logger.info(header)
                 
-                # Execute tool
-                outputs = await execute_tool_call(tool_call.name, tool_call.parameters)
+                # Execute tool (or reuse an identical read from this run)
+                outputs = await _run_tool(run, turn, tool_call)
                 
                 # Add to results for Cohere
                 tool_results.append({
@@ -120,7 +190,8 @@ async def run_agent(messages: list[dict]) -> tuple[str, list[dict]]:
                 })
 
             # Send tool results back to Cohere to generate final response
-            response = client.chat(
+            response = await asyncio.to_thread(
+                client.chat,
                 message="", # Continuation
                 chat_history=chat_history, # Logic handled by client state usually, but for stateless we might need to rely on the response object method if using SDK stateful client, OR provide tool_results.
                 # Cohere Python SDK 'chat' is stateless if no conversation_id is passed, but we need to pass back tool results.
@@ -130,9 +201,145 @@ async def run_agent(messages: list[dict]) -> tuple[str, list[dict]]:
                 model=agent_config["model"],
                 tools=agent_config["tools"]
             )
-            
-        return response.text, tool_calls_made
+            run.steps += 1
+        
+        text = response.text
+        if response.tool_calls and not text:
+            # The forced final answer asked for tools again
+            text = BUDGET_EXHAUSTED_REPLY
+        if turn is not None:
+            turn.finish(text)
+        return text, tool_calls_made
 
     except Exception as e:
         logger.error(f"Cohere API Error: {str(e)}")
-        return f"I encountered an error with the AI service: {str(e)}", []
+        text = f"I encountered an error with the AI service: {str(e)}"
+        if turn is not None:
+            turn.finish(text, error=str(e))
+        if raise_errors:
+            raise
+        return text, []
+
+
+# Cohere stream events buffered ahead of a slow consumer before the SDK read blocks
+STREAM_BUFFER_SIZE = 64
+_STREAM_END = object()
+
+
+async def _chat_stream(client, **kwargs) -> AsyncIterator:
+    """
+    Iterate client.chat_stream events without blocking the event loop.
+    The SDK iterator runs in a worker thread that pauses once
+    STREAM_BUFFER_SIZE events are waiting, so a slow consumer throttles
+    the read from Cohere instead of growing memory.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_BUFFER_SIZE)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for event in client.chat_stream(**kwargs):
+                if stop.is_set():
+                    break
+                asyncio.run_coroutine_threadsafe(queue.put(event), loop).result()
+        except Exception as e:
+            asyncio.run_coroutine_threadsafe(queue.put(e), loop).result()
+        finally:
+            asyncio.run_coroutine_threadsafe(queue.put(_STREAM_END), loop).result()
+
+    loop.run_in_executor(None, produce)
+    try:
+        while (item := await queue.get()) is not _STREAM_END:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # If the consumer went away early, stop the worker at its next event;
+        # draining frees the queue for any put it is blocked on
+        stop.set()
+        while not queue.empty():
+            queue.get_nowait()
+
+
+async def run_agent_stream(message: str, chat_history: list[dict]) -> AsyncIterator[dict]:
+    """
+    Run Cohere Agent like run_agent, yielding events as they happen:
+    {"type": "token", "text"} for each generated text fragment,
+    {"type": "tool_call", "tool", "arguments"} before and
+    {"type": "tool_result", "tool", "result"} after each tool execution,
+    and finally {"type": "done", "response", "tool_calls"}.
+    `chat_history` is in Cohere format (see to_chat_history) and is not modified.
+    """
+    agent_config = get_agent_config()
+    
+    with record_turn(message, chat_history, agent_config["model"]) as turn:
+        async for event in _run_agent_stream(message, chat_history, agent_config, turn):
+            yield event
+
+
+async def _run_agent_stream(message: str, chat_history: list[dict], agent_config: dict, turn) -> AsyncIterator[dict]:
+    client = agent_client(turn)
+    run = AgentRun()
+    tool_calls_made = []
+    request = {"message": message, "chat_history": chat_history}
+    forced = False
+    error = None
+    
+    try:
+        while True:
+            response = None
+            async for event in _chat_stream(client, preamble=AGENT_INSTRUCTIONS, **agent_config, **request):
+                if event.event_type == "text-generation":
+                    yield {"type": "token", "text": event.text}
+                elif event.event_type == "stream-end":
+                    response = event.response
+            
+            if response is None or not response.tool_calls or forced:
+                break
+            
+            reason = run.budget_exhausted()
+            if reason:
+                # Decline the pending calls and ask for an answer from what we have
+                request = {
+                    "message": "",
+                    "chat_history": chat_history,
+                    "tool_results": run.budget_results(response.tool_calls, reason),
+                    "force_single_step": True
+                }
+                forced = True
+                continue
+            
+            tool_results = []
+            for tool_call in response.tool_calls:
+                logger.info(f"Tool Call: {tool_call.name}")
+                yield {"type": "tool_call", "tool": tool_call.name, "arguments": tool_call.parameters}
+                
+                outputs = await _run_tool(run, turn, tool_call)
+                tool_results.append({"call": tool_call, "outputs": outputs})
+                tool_calls_made.append({
+                    "tool": tool_call.name,
+                    "arguments": tool_call.parameters,
+                    "result": outputs[0]
+                })
+                yield {"type": "tool_result", "tool": tool_call.name, "result": outputs[0]}
+            
+            # Continuation with the tool results, as in run_agent
+            request = {"message": "", "chat_history": chat_history, "tool_results": tool_results}
+            run.steps += 1
+        
+        text = response.text if response is not None else ""
+        if forced and not text:
+            # The forced final answer asked for tools again, or ended without a response
+            text = BUDGET_EXHAUSTED_REPLY
+            yield {"type": "token", "text": text}
+    
+    except Exception as e:
+        logger.error(f"Cohere API Error: {str(e)}")
+        text = f"I encountered an error with the AI service: {str(e)}"
+        error = str(e)
+        yield {"type": "token", "text": text}
+    
+    if turn is not None:
+        turn.finish(text, error)
+    yield {"type": "done", "response": text, "tool_calls": tool_calls_made}
@@ -1,4 +1,39 @@
 """API package initialization"""
 from .chat import router as chat_router, ChatRequest, ChatResponse
+from .conversations import (
+    router as conversations_router,
+    ConversationSummary,
+    ConversationListResponse,
+    MessageItem,
+    MessageHistoryResponse,
+)
+from .transfer import router as transfer_router, ImportResponse
+from .chat_ws import router as chat_ws_router, WebSocketChatMessage
+from .middleware import QueryStatsMiddleware, MemoryProfileMiddleware
+from .batch import (
+    router as batch_router,
+    BatchChatRequest,
+    BatchChatItemResult,
+    BatchChatResponse,
+)
 
-__all__ = ["chat_router", "ChatRequest", "ChatResponse"]
+__all__ = [
+    "chat_router",
+    "ChatRequest",
+    "ChatResponse",
+    "conversations_router",
+    "ConversationSummary",
+    "ConversationListResponse",
+    "MessageItem",
+    "MessageHistoryResponse",
+    "transfer_router",
+    "ImportResponse",
+    "chat_ws_router",
+    "WebSocketChatMessage",
+    "QueryStatsMiddleware",
+    "MemoryProfileMiddleware",
+    "batch_router",
+    "BatchChatRequest",
+    "BatchChatItemResult",
+    "BatchChatResponse",
+]
@@ -0,0 +1,230 @@
+"""
+Batch Chat Endpoint for Phase III Todo AI Chatbot.
+
+Processes many independent chat messages for one user in a single request,
+for integrations (email-to-task, imports from other tools) that would
+otherwise call POST /api/{user_id}/chat once per message.
+
+Execution per batch:
+1. Authorize every referenced conversation with one query
+2. Load each existing conversation's history once
+3. Run the agent for each item, at most CHAT_BATCH_CONCURRENCY at a time.
+   Items sharing a conversation_id run one after another in request order,
+   each seeing the turns before it
+4. As soon as a conversation's items have run, persist its user and
+   assistant messages with one flush and one commit, so finished
+   conversations are kept even if a later one fails or the client leaves.
+   An item without a conversation_id gets its conversation created here,
+   only once its agent run has succeeded
+5. Return a result or an error per item, in request order
+
+An item that fails (unknown or foreign conversation, agent error) is
+reported in its result and persists nothing, not even a new conversation;
+the other items are unaffected. Tool calls the agent made before failing
+are not undone.
+"""
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
+from sqlmodel import Session, select
+from typing import Optional
+from datetime import datetime
+import asyncio
+import logging
+import os
+
+from ..db import get_session, get_read_session, Conversation, Message, MessageRole
+from ..agent import run_agent
+from .chat import ChatRequest, load_history, record_message
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Agent runs in flight at once per batch request
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))
+CHAT_BATCH_MAX_ITEMS = 100
+
+
+class BatchChatRequest(BaseModel):
+    """Batch chat request: independent chat requests processed together"""
+    requests: list[ChatRequest] = Field(min_length=1, max_length=CHAT_BATCH_MAX_ITEMS)
+
+
+class BatchChatItemResult(BaseModel):
+    """Outcome of one batch item; `error` is set instead of `response` on failure"""
+    index: int
+    conversation_id: Optional[int] = None
+    response: Optional[str] = None
+    tool_calls: list[dict] = []
+    error: Optional[str] = None
+
+
+class BatchChatResponse(BaseModel):
+    """Per-item results, in request order"""
+    results: list[BatchChatItemResult]
+
+
+async def run_conversation_turns(
+    user_id: str,
+    turns: list[tuple[int, ChatRequest]],
+    history: list[dict],
+    semaphore: asyncio.Semaphore,
+    results: list[BatchChatItemResult]
+) -> list[tuple[int, Message, Message]]:
+    """
+    Run one conversation's batch items in order, appending each completed
+    turn to the in-memory history seen by the next.
+    Returns (index, user message, assistant message) per successful item,
+    with the messages not yet added to a session or assigned a conversation.
+    """
+    completed = []
+    for index, request in turns:
+        started_at = datetime.utcnow()
+        agent_messages = history + [{"role": "user", "content": request.message}]
+        try:
+            async with semaphore:
+                assistant_response, tool_calls = await run_agent(agent_messages, raise_errors=True)
+        except Exception as e:
+            logger.error(f"Batch item {index} failed: {str(e)}")
+            results[index].error = f"Agent error: {str(e)}"
+            continue
+
+        history = agent_messages + [{"role": "assistant", "content": assistant_response}]
+        results[index].response = assistant_response
+        results[index].tool_calls = tool_calls
+        completed.append((
+            index,
+            Message(
+                user_id=user_id,
+                role=MessageRole.USER,
+                content=request.message,
+                created_at=started_at
+            ),
+            Message(
+                user_id=user_id,
+                role=MessageRole.ASSISTANT,
+                content=assistant_response,
+                created_at=datetime.utcnow()
+            )
+        ))
+    return completed
+
+
+def persist_turns(
+    db: Session,
+    user_id: str,
+    conversation: Optional[Conversation],
+    completed: list[tuple[int, Message, Message]],
+    results: list[BatchChatItemResult]
+) -> None:
+    """
+    Save one conversation's completed turns with a single commit, creating
+    the conversation first when it is None. Nothing is saved, not even the
+    conversation, when no turn completed. On failure the turns are reported
+    as errors instead.
+    """
+    if not completed:
+        return
+
+    messages = [message for _, user_message, assistant_message in completed
+                for message in (user_message, assistant_message)]
+    try:
+        if conversation is None:
+            started_at = messages[0].created_at
+            conversation = Conversation(user_id=user_id, created_at=started_at, updated_at=started_at)
+            db.add(conversation)
+            db.flush()
+        for message in messages:
+            message.conversation_id = conversation.id
+        db.add_all(messages)
+        db.flush()
+        for message in messages:
+            record_message(conversation, message)
+        conversation_id = conversation.id
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Saving batch turns of user {user_id} failed: {str(e)}")
+        for index, _, _ in completed:
+            results[index].response = None
+            results[index].tool_calls = []
+            results[index].error = "Failed to save messages"
+        return
+
+    for index, _, _ in completed:
+        results[index].conversation_id = conversation_id
+
+
+@router.post("/api/{user_id}/chat/batch", response_model=BatchChatResponse)
+async def chat_batch_endpoint(
+    user_id: str,
+    batch: BatchChatRequest,
+    db: Session = Depends(get_session),
+    read_db: Session = Depends(get_read_session)
+) -> BatchChatResponse:
+    """
+    POST /api/{user_id}/chat/batch
+
+    Batched variant of the stateless chat endpoint (Section 8.6).
+    Per-item failures are returned in the results, never as an HTTP error.
+    """
+    results = [BatchChatItemResult(index=index) for index in range(len(batch.requests))]
+
+    # Step 1: Authorize existing conversations in one query
+    requested_ids = {request.conversation_id for request in batch.requests if request.conversation_id}
+    conversations = {
+        conversation.id: conversation
+        for conversation in db.exec(
+            select(Conversation).where(Conversation.id.in_(requested_ids))
+        ).all()
+    } if requested_ids else {}
+
+    # Group items by conversation; each new-conversation item is its own group
+    groups: dict[int, list[tuple[int, ChatRequest]]] = {}
+    new_items: list[tuple[int, ChatRequest]] = []
+    for index, request in enumerate(batch.requests):
+        if not request.conversation_id:
+            new_items.append((index, request))
+            continue
+
+        conversation = conversations.get(request.conversation_id)
+        if not conversation:
+            results[index].error = "Conversation not found"
+        elif conversation.user_id != user_id:
+            results[index].error = "Not authorized"
+        else:
+            results[index].conversation_id = conversation.id
+            groups.setdefault(conversation.id, []).append((index, request))
+
+    # Step 2: Load each existing conversation's history once
+    histories = {
+        conversation_id: [
+            {"role": message.role.value, "content": message.content}
+            for message in load_history(db, read_db, conversations[conversation_id])
+        ]
+        for conversation_id in groups
+    }
+
+    # Steps 3 and 4: Run conversations concurrently, turns within one in
+    # order, and save each conversation as soon as its turns are done.
+    # persist_turns never awaits, so groups do not interleave on the session.
+    semaphore = asyncio.Semaphore(CHAT_BATCH_CONCURRENCY)
+
+    async def run_and_persist(
+        conversation: Optional[Conversation],
+        turns: list[tuple[int, ChatRequest]],
+        history: list[dict]
+    ) -> None:
+        completed = await run_conversation_turns(user_id, turns, history, semaphore, results)
+        persist_turns(db, user_id, conversation, completed, results)
+
+    await asyncio.gather(
+        *(
+            run_and_persist(conversations[conversation_id], turns, histories[conversation_id])
+            for conversation_id, turns in groups.items()
+        ),
+        *(run_and_persist(None, [item], []) for item in new_items)
+    )
+
+    # Step 5: Per-item results, in request order
+    return BatchChatResponse(results=results)
@@ -25,12 +25,73 @@ from typing import Optional
 from datetime import datetime
 import json
 
-from ..db import get_session, Conversation, Message, MessageRole
+from ..db import get_session, get_read_session, Conversation, Message, MessageRole
+from ..db.archive import MESSAGE_HOT_WINDOW, load_archived_messages
+from ..db.models import PREVIEW_LENGTH
 from ..agent import run_agent
 
 router = APIRouter()
 
 
+def record_message(conversation: Conversation, message: Message) -> None:
+    """
+    Maintain the denormalized conversation summary for a newly persisted message.
+    The message must already be flushed so that its ID is assigned.
+    Keeps conversation listings served without touching the message table.
+    """
+    conversation.message_count = (conversation.message_count or 0) + 1
+    conversation.last_message_preview = message.content[:PREVIEW_LENGTH]
+    conversation.last_message_at = message.created_at
+    conversation.last_message_id = message.id
+    conversation.updated_at = message.created_at
+
+
+def get_owned_conversation(db: Session, conversation_id: int, user_id: str) -> Conversation:
+    """
+    Load a conversation and verify it belongs to the user.
+    Raises 404 if it does not exist and 403 if it belongs to someone else.
+    """
+    conversation = db.get(Conversation, conversation_id)
+    
+    if not conversation:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    
+    if conversation.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    return conversation
+
+
+def load_history(db: Session, read_db: Session, conversation: Conversation) -> list[Message]:
+    """
+    Load the conversation's most recent MESSAGE_HOT_WINDOW messages, oldest
+    first, from the read session. Reads through to the message archive only
+    when the hot rows do not fill the window.
+    Falls back to the primary when a replica has not yet caught up with the
+    conversation's last message, so a turn always sees the previous one.
+    """
+    messages_query = select(Message).where(
+        Message.conversation_id == conversation.id
+    ).order_by(Message.id.desc()).limit(MESSAGE_HOT_WINDOW)
+    history = read_db.exec(messages_query).all()
+    
+    if read_db.get_bind() is not db.get_bind() and conversation.last_message_id is not None:
+        latest_id = history[0].id if history else 0
+        if latest_id < conversation.last_message_id:
+            read_db = db
+            history = db.exec(messages_query).all()
+    
+    history.reverse()
+    
+    # Older messages may have been archived; the counter tells us without a query
+    missing = min(conversation.message_count, MESSAGE_HOT_WINDOW) - len(history)
+    if missing > 0:
+        before_id = history[0].id if history else None
+        history = load_archived_messages(read_db, conversation.id, before_id, missing) + history
+    
+    return history
+
+
 class ChatRequest(BaseModel):
     """Chat request schema per Section 8.6"""
     message: str
@@ -48,7 +109,8 @@ class ChatResponse(BaseModel):
 async def chat_endpoint(
     user_id: str,
     request: ChatRequest,
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_session),
+    read_db: Session = Depends(get_read_session)
 ) -> ChatResponse:
     """
     POST /api/{user_id}/chat
@@ -60,19 +122,10 @@ async def chat_endpoint(
     # Step 1 & 2: Get or create conversation, load history
     if request.conversation_id:
         # Load existing conversation
-        conversation = db.get(Conversation, request.conversation_id)
-        
-        if not conversation:
-            raise HTTPException(status_code=404, detail="Conversation not found")
-        
-        if conversation.user_id != user_id:
-            raise HTTPException(status_code=403, detail="Not authorized")
+        conversation = get_owned_conversation(db, request.conversation_id, user_id)
         
         # Load message history (Section 2.2: conversation continuity from DB)
-        messages_query = select(Message).where(
-            Message.conversation_id == conversation.id
-        ).order_by(Message.created_at)
-        history = db.exec(messages_query).all()
+        history = load_history(db, read_db, conversation)
         
     else:
         # Create new conversation
@@ -95,6 +148,9 @@ async def chat_endpoint(
         created_at=datetime.utcnow()
     )
     db.add(user_message)
+    db.flush()
+    record_message(conversation, user_message)
+    db.add(conversation)
     db.commit()
     
     # Convert history to agent format
@@ -116,9 +172,10 @@ async def chat_endpoint(
         created_at=datetime.utcnow()
     )
     db.add(assistant_message)
+    db.flush()
     
-    # Update conversation timestamp
-    conversation.updated_at = datetime.utcnow()
+    # Update conversation timestamp and summary columns
+    record_message(conversation, assistant_message)
     db.add(conversation)
     db.commit()
     
@@ -0,0 +1,244 @@
+"""
+WebSocket Chat Channel for Phase III Todo AI Chatbot.
+
+/ws/{user_id}/chat?conversation_id=N keeps one conversation open for the
+lifetime of the connection. The conversation is authorized and its history
+loaded once, on connect (or on the first message for a new conversation).
+Each turn then appends to the in-memory Cohere chat_history instead of
+reloading it. Messages are still persisted per turn exactly like
+POST /api/{user_id}/chat, so the database stays the source of truth: if
+the conversation gained messages elsewhere (another tab, the HTTP
+endpoint), the history is reloaded before the next turn.
+
+Protocol (JSON text frames):
+- client -> server: {"message": "..."}
+- server -> client:
+    {"type": "ready", "conversation_id"}       once the conversation is loaded
+    {"type": "token", "text"}                  response text as it is generated
+    {"type": "tool_call", "tool", "arguments"}
+    {"type": "tool_result", "tool", "result"}
+    {"type": "done", "conversation_id", "response", "tool_calls"}
+    {"type": "error", "detail"}
+
+Database sessions last one operation, not the connection, so idle sockets
+hold no pooled connections. Turns run one at a time per connection. Outgoing events go through a
+bounded queue drained by a sender task. A slow client therefore
+throttles the agent stream, rather than buffering it, and is
+disconnected once a single send stalls for WS_SEND_TIMEOUT_SECONDS.
+Connections idle for WS_IDLE_TIMEOUT_SECONDS are closed.
+"""
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import BaseModel, ValidationError
+from sqlmodel import Session
+from typing import Optional
+from datetime import datetime
+import asyncio
+import logging
+import os
+
+from ..db import get_engine, get_read_engine, Conversation, Message, MessageRole
+from ..db import track_queries, query_metrics
+from ..profiling import memory_profiler
+from ..db.archive import MESSAGE_HOT_WINDOW
+from ..agent import run_agent_stream, to_chat_history
+from .chat import get_owned_conversation, load_history, record_message
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+WS_IDLE_TIMEOUT_SECONDS = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "300"))
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+# Events waiting to be sent before the agent stream is paused
+WS_SEND_QUEUE_SIZE = 128
+
+
+class WebSocketChatMessage(BaseModel):
+    """Client frame: one user message in the connection's conversation"""
+    message: str
+
+
+class ChatConnection:
+    """
+    Per-connection chat state: the authorized conversation's ID, its Cohere
+    chat_history, and the outgoing event queue.
+
+    Database sessions are opened per operation and closed (or committed)
+    before anything is awaited, so an idle connection, or one waiting on
+    the agent, holds no pooled connection.
+    """
+
+    def __init__(self, websocket: WebSocket, user_id: str):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.conversation_id: Optional[int] = None
+        self.chat_history: list[dict] = []
+        # ID of the newest message reflected in chat_history
+        self.last_message_id: Optional[int] = None
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+
+    def open(self, conversation_id: int) -> None:
+        """Authorize an existing conversation and load its history."""
+        with Session(get_engine(self.user_id)) as db:
+            self.load(db, get_owned_conversation(db, conversation_id, self.user_id))
+
+    def load(self, db: Session, conversation: Conversation) -> None:
+        """Load the conversation's history window into chat_history."""
+        with Session(get_read_engine(self.user_id)) as read_db:
+            history = load_history(db, read_db, conversation)
+        self.conversation_id = conversation.id
+        self.chat_history = to_chat_history(
+            [{"role": message.role.value, "content": message.content} for message in history]
+        )
+        self.last_message_id = conversation.last_message_id
+        # End the read transaction; the turn continues in a new one
+        db.commit()
+
+    def ensure_current(self, db: Session) -> None:
+        """Reload the history if the conversation gained messages outside this connection."""
+        conversation = db.get(Conversation, self.conversation_id)
+        if conversation.last_message_id != self.last_message_id:
+            self.load(db, conversation)
+
+    def persist(self, db: Session, role: MessageRole, content: str, created_at: datetime) -> None:
+        """Persist one message, commit, and append it to the in-memory history."""
+        conversation = db.get(Conversation, self.conversation_id)
+        message = Message(
+            conversation_id=self.conversation_id,
+            user_id=self.user_id,
+            role=role,
+            content=content,
+            created_at=created_at
+        )
+        db.add(message)
+        db.flush()
+        self.last_message_id = message.id
+        record_message(conversation, message)
+        db.add(conversation)
+        db.commit()
+
+        self.chat_history.append({
+            "role": "USER" if role == MessageRole.USER else "CHATBOT",
+            "message": content
+        })
+        # Keep the same window a freshly loaded history would have
+        del self.chat_history[:-MESSAGE_HOT_WINDOW]
+
+    async def run_turn(self, content: str) -> None:
+        """Run one chat turn, counting its statements and sampling its memory like an HTTP request."""
+        with track_queries() as stats, memory_profiler.profile_request("WS /ws/{user_id}/chat"):
+            try:
+                await self._stream_turn(content)
+            finally:
+                query_metrics.observe("WS /ws/{user_id}/chat", stats)
+
+    async def _stream_turn(self, content: str) -> None:
+        """Run one chat turn, streaming its events to the client."""
+        # The agent sees the history before this turn; persist the user message first
+        created = False
+        with Session(get_engine(self.user_id)) as db:
+            if self.conversation_id is None:
+                now = datetime.utcnow()
+                conversation = Conversation(user_id=self.user_id, created_at=now, updated_at=now)
+                db.add(conversation)
+                db.flush()
+                self.conversation_id = conversation.id
+                created = True
+            else:
+                self.ensure_current(db)
+            chat_history = list(self.chat_history)
+            self.persist(db, MessageRole.USER, content, datetime.utcnow())
+
+        if created:
+            await self.outbox.put({"type": "ready", "conversation_id": self.conversation_id})
+
+        async for event in run_agent_stream(content, chat_history):
+            if event["type"] == "done":
+                with Session(get_engine(self.user_id)) as db:
+                    self.persist(db, MessageRole.ASSISTANT, event["response"], datetime.utcnow())
+                event = {**event, "conversation_id": self.conversation_id}
+            await self.outbox.put(event)
+
+    async def send_events(self) -> None:
+        """Drain the outgoing queue; give up on a client that stops reading."""
+        while (event := await self.outbox.get()) is not None:
+            await asyncio.wait_for(self.websocket.send_json(event), WS_SEND_TIMEOUT_SECONDS)
+
+
+@router.websocket("/ws/{user_id}/chat")
+async def chat_websocket(
+    websocket: WebSocket,
+    user_id: str,
+    conversation_id: Optional[int] = None
+):
+    """
+    WS /ws/{user_id}/chat
+
+    Connection-scoped variant of the chat endpoint (Section 8.6); see the
+    module docstring for the protocol.
+    """
+    await websocket.accept()
+    connection = ChatConnection(websocket, user_id)
+
+    if conversation_id is not None:
+        try:
+            connection.open(conversation_id)
+        except HTTPException as e:
+            await websocket.send_json({"type": "error", "detail": e.detail})
+            code = status.WS_1008_POLICY_VIOLATION if e.status_code == 403 else status.WS_1000_NORMAL_CLOSURE
+            await websocket.close(code=code)
+            return
+        await connection.outbox.put({"type": "ready", "conversation_id": conversation_id})
+
+    sender = asyncio.create_task(connection.send_events())
+    close_code = status.WS_1000_NORMAL_CLOSURE
+    try:
+        while True:
+            receive = asyncio.ensure_future(websocket.receive_text())
+            done, _ = await asyncio.wait(
+                {receive, sender}, timeout=WS_IDLE_TIMEOUT_SECONDS, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                receive.cancel()
+                await connection.outbox.put({"type": "error", "detail": "Idle timeout"})
+                close_code = status.WS_1001_GOING_AWAY
+                break
+            if sender in done:
+                # The sender only stops early when the client stalls or goes away
+                receive.cancel()
+                close_code = status.WS_1008_POLICY_VIOLATION
+                break
+
+            try:
+                frame = WebSocketChatMessage.model_validate_json(receive.result())
+            except ValidationError as e:
+                await connection.outbox.put({"type": "error", "detail": f"Invalid message: {e.errors()[0]['msg']}"})
+                continue
+
+            # Watch the sender during the turn too, so a stalled client cannot block it
+            turn = asyncio.create_task(connection.run_turn(frame.message))
+            await asyncio.wait({turn, sender}, return_when=asyncio.FIRST_COMPLETED)
+            if not turn.done():
+                turn.cancel()
+                close_code = status.WS_1008_POLICY_VIOLATION
+                break
+            turn.result()
+
+    except WebSocketDisconnect:
+        sender.cancel()
+        return
+    except Exception as e:
+        logger.error(f"WebSocket chat error: {str(e)}")
+        close_code = status.WS_1011_INTERNAL_ERROR
+
+    # Flush pending events, then close
+    if not sender.done():
+        await connection.outbox.put(None)
+        try:
+            await sender
+        except Exception:
+            pass
+    try:
+        await websocket.close(code=close_code)
+    except RuntimeError:
+        pass  # already closed by the client
@@ -0,0 +1,221 @@
+"""
+Conversation Listing Endpoint for Phase III Todo AI Chatbot.
+
+Serves a user's conversations from the denormalized summary columns on
+Conversation (message_count, last_message_preview, last_message_at), so a
+listing never touches the message table.
+
+Pagination is keyset-based on (updated_at, id), newest first. The cursor
+returned in `next_cursor` is opaque to clients and is passed back verbatim.
+
+Message history is paged backwards with `before_id`/`limit`. History
+responses carry an ETag derived from Conversation.updated_at and
+last_message_id, so repeat polls are answered with 304 Not Modified from
+the conversation row alone, without loading any messages. Pages reaching
+past the hot messages read through to the compressed message archive.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel
+from sqlmodel import Session, select, or_, and_
+from typing import Optional
+from datetime import datetime
+import base64
+import hashlib
+
+from ..db import get_session, Conversation, Message
+from ..db.archive import load_archived_messages
+from .chat import get_owned_conversation
+
+router = APIRouter()
+
+
+class ConversationSummary(BaseModel):
+    """Single conversation in a listing"""
+    id: int
+    created_at: str
+    updated_at: str
+    message_count: int
+    last_message_preview: Optional[str]
+    last_message_at: Optional[str]
+
+
+class ConversationListResponse(BaseModel):
+    """Conversation listing page"""
+    conversations: list[ConversationSummary]
+    next_cursor: Optional[str] = None
+
+
+class MessageItem(BaseModel):
+    """Single message in a conversation history page"""
+    id: int
+    role: str
+    content: str
+    created_at: str
+
+
+class MessageHistoryResponse(BaseModel):
+    """Conversation history page, oldest message first"""
+    conversation_id: int
+    messages: list[MessageItem]
+    next_before_id: Optional[int] = None
+
+
+def encode_cursor(updated_at: datetime, conversation_id: int) -> str:
+    """Encode a (updated_at, id) keyset position as an opaque cursor."""
+    raw = f"{updated_at.isoformat()}|{conversation_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode an opaque cursor back into its (updated_at, id) keyset position."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        updated_at, conversation_id = raw.split("|", 1)
+        return datetime.fromisoformat(updated_at), int(conversation_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/api/{user_id}/conversations", response_model=ConversationListResponse)
+async def list_conversations_endpoint(
+    user_id: str,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_session)
+) -> ConversationListResponse:
+    """
+    GET /api/{user_id}/conversations
+
+    Lists the user's conversations, most recently updated first.
+    Keyset pagination on (updated_at, id) via the `cursor` query parameter.
+    """
+    query = select(Conversation).where(Conversation.user_id == user_id)
+
+    if cursor:
+        updated_at, conversation_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                Conversation.updated_at < updated_at,
+                and_(
+                    Conversation.updated_at == updated_at,
+                    Conversation.id < conversation_id
+                )
+            )
+        )
+
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(
+        Conversation.updated_at.desc(),
+        Conversation.id.desc()
+    ).limit(limit + 1)
+    rows = db.exec(query).all()
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(last.updated_at, last.id)
+
+    return ConversationListResponse(
+        conversations=[
+            ConversationSummary(
+                id=conversation.id,
+                created_at=conversation.created_at.isoformat(),
+                updated_at=conversation.updated_at.isoformat(),
+                message_count=conversation.message_count,
+                last_message_preview=conversation.last_message_preview,
+                last_message_at=(
+                    conversation.last_message_at.isoformat()
+                    if conversation.last_message_at else None
+                )
+            )
+            for conversation in page
+        ],
+        next_cursor=next_cursor
+    )
+
+
+def history_etag(conversation: Conversation, before_id: Optional[int], limit: int) -> str:
+    """
+    Build the ETag for a history page.
+    Changes whenever a message is appended to the conversation, and differs
+    per page so that distinct pages never share a validator.
+    """
+    raw = (
+        f"{conversation.id}:{conversation.updated_at.isoformat()}:"
+        f"{conversation.last_message_id}:{before_id}:{limit}"
+    )
+    return f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+@router.get(
+    "/api/{user_id}/conversations/{conversation_id}/messages",
+    response_model=MessageHistoryResponse,
+    responses={304: {"description": "Not Modified"}}
+)
+async def list_messages_endpoint(
+    user_id: str,
+    conversation_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=200),
+    before_id: Optional[int] = Query(default=None, ge=1),
+    db: Session = Depends(get_session)
+):
+    """
+    GET /api/{user_id}/conversations/{conversation_id}/messages
+
+    Returns a page of messages older than `before_id` (or the latest page),
+    in chronological order. `next_before_id` fetches the preceding page.
+    """
+    conversation = get_owned_conversation(db, conversation_id, user_id)
+
+    # Answer repeat polls from the conversation row alone
+    etag = history_etag(conversation, before_id, limit)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    query = select(Message).where(Message.conversation_id == conversation.id)
+    if before_id is not None:
+        query = query.where(Message.id < before_id)
+
+    # Newest first so the limit keeps the most recent page, plus one to detect more
+    query = query.order_by(Message.id.desc()).limit(limit + 1)
+    rows = list(db.exec(query).all())
+
+    # Older pages may reach into the message archive
+    if len(rows) <= limit and (before_id is not None or len(rows) < conversation.message_count):
+        oldest_id = rows[-1].id if rows else before_id
+        archived = load_archived_messages(db, conversation.id, oldest_id, limit + 1 - len(rows))
+        rows.extend(reversed(archived))
+
+    page = rows[:limit]
+    next_before_id = page[-1].id if len(rows) > limit else None
+    page.reverse()
+
+    response.headers.update(headers)
+    return MessageHistoryResponse(
+        conversation_id=conversation.id,
+        messages=[
+            MessageItem(
+                id=message.id,
+                role=message.role.value,
+                content=message.content,
+                created_at=message.created_at.isoformat()
+            )
+            for message in page
+        ],
+        next_before_id=next_before_id
+    )
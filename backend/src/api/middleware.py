@@ -0,0 +1,84 @@
+"""
+Per-request instrumentation middleware.
+
+QueryStatsMiddleware: SQL statement accounting.
+
+Wraps every HTTP request in a query tracking scope (see db/query_stats.py),
+so the statements of the endpoint and of the tool handlers it invokes are
+counted together. Results are aggregated per route into query_metrics and
+statements repeated within a request are logged as possible N+1 queries.
+
+With QUERY_STATS_HEADERS=true, responses also carry the counts as of the
+start of the response:
+    X-DB-Query-Count, X-DB-Query-Time-Ms, X-DB-Repeated-Queries
+    Server-Timing: db;dur=<ms>;desc="<n> queries"
+Statements issued while a streaming body is sent (e.g. the export) are
+included in the metrics but not in the headers.
+
+MemoryProfileMiddleware: sampled tracemalloc peaks per endpoint (see
+src/profiling.py); a no-op unless MEMORY_PROFILE_SAMPLE_RATE is set.
+"""
+
+import os
+
+from ..db.query_stats import track_queries, query_metrics
+from ..profiling import memory_profiler
+
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "false").lower() in ("1", "true", "yes")
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware, so streamed responses stay inside the tracking scope."""
+
+    def __init__(self, app, headers: bool = QUERY_STATS_HEADERS):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start" and self.headers:
+                    db_ms = stats.seconds * 1000
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-query-time-ms", f"{db_ms:.1f}".encode()),
+                        (b"x-db-repeated-queries", str(len(stats.repeated())).encode()),
+                        (b"server-timing", f'db;dur={db_ms:.1f};desc="{stats.count} queries"'.encode())
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                query_metrics.observe(endpoint_label(scope), stats)
+
+
+class MemoryProfileMiddleware:
+    """Pure ASGI middleware that profiles a sample of HTTP requests, including streamed bodies."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or memory_profiler.sample_rate <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        with memory_profiler.profile_request(f"{scope['method']} {scope['path']}") as profile:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if profile is not None:
+                    profile.label = endpoint_label(scope)
+                    await memory_profiler.record_sites(profile)
+
+
+def endpoint_label(scope) -> str:
+    """Method and route template of a handled request, e.g. "GET /api/{user_id}/conversations"."""
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route else 'unmatched'}"
@@ -0,0 +1,64 @@
+"""
+Account Export/Import Endpoints for Phase III Todo AI Chatbot.
+
+Streams a user's tasks, conversations and messages out as NDJSON and
+ingests the same format back in (see db/transfer.py for the format).
+Both directions run in constant memory regardless of account size.
+"""
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+import time
+
+from ..db.transfer import iter_export, import_ndjson
+
+router = APIRouter()
+
+
+class ImportResponse(BaseModel):
+    """Import summary"""
+    tasks: int
+    conversations: int
+    messages: int
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+@router.get("/api/{user_id}/export")
+async def export_endpoint(user_id: str) -> StreamingResponse:
+    """
+    GET /api/{user_id}/export
+
+    Streams all of the user's tasks, conversations and messages as NDJSON.
+    """
+    return StreamingResponse(
+        iter_export(user_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{user_id}-export.ndjson"'}
+    )
+
+
+@router.post("/api/{user_id}/import", response_model=ImportResponse)
+async def import_endpoint(user_id: str, request: Request) -> ImportResponse:
+    """
+    POST /api/{user_id}/import
+
+    Ingests an NDJSON export (as produced by the export endpoint) into the
+    user's account. The request body is streamed, never read whole.
+    """
+    start = time.perf_counter()
+    try:
+        counts = await import_ndjson(user_id, request.stream())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    return ImportResponse(
+        tasks=counts["task"],
+        conversations=counts["conversation"],
+        messages=counts["message"],
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(total / elapsed, 1) if elapsed else 0.0
+    )
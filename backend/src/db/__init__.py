@@ -1,13 +1,31 @@
 """Database package initialization"""
-from .models import Task, Conversation, Message, MessageRole
-from .session import engine, get_session, create_db_and_tables
+from .models import Task, Conversation, Message, MessageRole, MessageArchive
+from .session import (
+    router,
+    get_engine,
+    get_read_engine,
+    get_session,
+    get_read_session,
+    record_write,
+    create_db_and_tables,
+)
+from .query_stats import QueryStats, track_queries, current_query_stats, query_metrics
 
 __all__ = [
     "Task",
     "Conversation", 
     "Message",
     "MessageRole",
-    "engine",
+    "MessageArchive",
+    "router",
+    "get_engine",
+    "get_read_engine",
     "get_session",
+    "get_read_session",
+    "record_write",
     "create_db_and_tables",
+    "QueryStats",
+    "track_queries",
+    "current_query_stats",
+    "query_metrics",
 ]
@@ -0,0 +1,299 @@
+"""
+Hot/cold message storage.
+
+Moves a conversation's oldest messages out of the message table into
+compressed per-conversation batches in message_archive. Messages are
+archived when they are older than MESSAGE_ARCHIVE_AFTER_DAYS or fall
+outside the most recent MESSAGE_HOT_WINDOW messages of their conversation.
+Either way, archived messages always precede the ones left in the message
+table.
+
+Payloads are JSON compressed with zstd when the optional `zstandard`
+package is installed, and zlib otherwise. Readers decompress on demand
+(load_archived_messages, iter_archived_messages).
+
+The job runs in bounded batches with a pause between them, either as a
+command:
+    python -m src.db.archive [--max-batches N] [--pause SECONDS]
+or in-process every ARCHIVE_INTERVAL_SECONDS when that is set. Every
+worker process then runs the job; on PostgreSQL an advisory lock lets only
+one of them archive a database at a time, and a batch whose messages were
+already taken by another archiver is rolled back rather than archived twice.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator
+from sqlalchemy import delete, or_, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from .models import Conversation, Message, MessageRole, MessageArchive
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_ARCHIVE_AFTER_DAYS = float(os.getenv("MESSAGE_ARCHIVE_AFTER_DAYS", "30"))
+MESSAGE_HOT_WINDOW = int(os.getenv("MESSAGE_HOT_WINDOW", "200"))
+# Messages per archive row, and per transaction of the job
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_BATCH_PAUSE_SECONDS = float(os.getenv("ARCHIVE_BATCH_PAUSE_SECONDS", "0.5"))
+ARCHIVE_MAX_BATCHES = int(os.getenv("ARCHIVE_MAX_BATCHES", "100"))
+# In-process job interval; 0 disables it
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "0"))
+
+CODEC = "zstd" if zstandard is not None else "zlib"
+# Conversations scanned per page while looking for archivable messages
+CONVERSATION_PAGE_SIZE = 100
+# PostgreSQL advisory lock key held while a process archives a database
+ARCHIVE_LOCK_KEY = 0x6D736761726368
+
+
+def compress_messages(messages: list[dict]) -> tuple[str, bytes]:
+    """Compress a list of message dicts with the best available codec."""
+    raw = json.dumps(messages, separators=(",", ":")).encode()
+    if CODEC == "zstd":
+        return CODEC, zstandard.ZstdCompressor(level=10).compress(raw)
+    return CODEC, zlib.compress(raw, 9)
+
+
+def decompress_messages(codec: str, payload: bytes) -> list[dict]:
+    """Decompress an archive payload back into message dicts."""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed message archives")
+        raw = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec == "zlib":
+        raw = zlib.decompress(payload)
+    else:
+        raise ValueError(f"Unknown archive codec: {codec}")
+    return json.loads(raw)
+
+
+def _to_message(archive: MessageArchive, data: dict) -> Message:
+    """Rebuild a transient (never persisted) Message from archived data."""
+    return Message(
+        id=data["id"],
+        conversation_id=archive.conversation_id,
+        user_id=archive.user_id,
+        role=MessageRole(data["role"]),
+        content=data["content"],
+        created_at=datetime.fromisoformat(data["created_at"])
+    )
+
+
+def load_archived_messages(
+    session: Session,
+    conversation_id: int,
+    before_id: int | None,
+    limit: int
+) -> list[Message]:
+    """
+    Return up to `limit` of the most recent archived messages with an ID
+    below `before_id`, oldest first. Decompresses only the batches needed.
+    """
+    query = select(MessageArchive).where(MessageArchive.conversation_id == conversation_id)
+    if before_id is not None:
+        query = query.where(MessageArchive.first_message_id < before_id)
+    query = query.order_by(MessageArchive.last_message_id.desc())
+
+    collected: list[Message] = []
+    for archive in session.exec(query):
+        batch = [
+            _to_message(archive, data)
+            for data in decompress_messages(archive.codec, archive.payload)
+            if before_id is None or data["id"] < before_id
+        ]
+        collected = batch[-(limit - len(collected)):] + collected
+        if len(collected) >= limit:
+            break
+    return collected
+
+
+def iter_archived_messages(conn, user_id: str) -> Iterator[dict]:
+    """
+    Stream all of a user's archived messages as dicts with conversation_id,
+    ordered by conversation and ID, decompressing one batch at a time.
+    """
+    query = (
+        select(MessageArchive.conversation_id, MessageArchive.codec, MessageArchive.payload)
+        .where(MessageArchive.user_id == user_id)
+        .order_by(MessageArchive.conversation_id, MessageArchive.first_message_id)
+    )
+    for conversation_id, codec, payload in conn.execution_options(yield_per=10).execute(query):
+        for data in decompress_messages(codec, payload):
+            yield {"id": data["id"], "conversation_id": conversation_id, **data}
+
+
+def archive_conversation_batch(
+    session: Session,
+    conversation_id: int,
+    cutoff: datetime,
+    hot_window: int,
+    batch_size: int
+) -> int:
+    """
+    Archive the next batch of a conversation's cold messages in one transaction.
+    Returns the number of messages archived (0 when nothing is cold, or when
+    another archiver took the batch first).
+    """
+    # ID of the newest message outside the hot window, if the window is full
+    boundary = session.exec(
+        select(Message.id)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.id.desc())
+        .offset(hot_window)
+        .limit(1)
+    ).first()
+
+    cold = Message.created_at < cutoff
+    if boundary is not None:
+        cold = or_(cold, Message.id <= boundary)
+
+    messages = session.exec(
+        select(Message)
+        .where(Message.conversation_id == conversation_id, cold)
+        .order_by(Message.id)
+        .limit(batch_size)
+    ).all()
+    if not messages:
+        return 0
+
+    codec, payload = compress_messages([
+        {
+            "id": message.id,
+            "role": message.role.value,
+            "content": message.content,
+            "created_at": message.created_at.isoformat()
+        }
+        for message in messages
+    ])
+    # A concurrent archiver may have taken some of these messages first
+    deleted = session.exec(delete(Message).where(Message.id.in_([message.id for message in messages])))
+    if deleted.rowcount != len(messages):
+        session.rollback()
+        return 0
+
+    session.add(MessageArchive(
+        conversation_id=conversation_id,
+        user_id=messages[0].user_id,
+        first_message_id=messages[0].id,
+        last_message_id=messages[-1].id,
+        message_count=len(messages),
+        codec=codec,
+        payload=payload
+    ))
+    session.commit()
+    return len(messages)
+
+
+@contextmanager
+def archive_lock(engine: Engine) -> Iterator[bool]:
+    """
+    Hold the database's archival lock for the duration of the block, yielding
+    whether it was acquired. On PostgreSQL this is a transaction-level
+    advisory lock on its own connection, so it also works behind PgBouncer
+    in transaction mode and is released if the process dies. Other databases
+    always acquire it.
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    with engine.begin() as conn:
+        yield conn.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ARCHIVE_LOCK_KEY}
+        ).scalar()
+
+
+def run_archival(
+    engine: Engine,
+    max_batches: int = ARCHIVE_MAX_BATCHES,
+    pause_seconds: float = ARCHIVE_BATCH_PAUSE_SECONDS,
+    older_than: timedelta = timedelta(days=MESSAGE_ARCHIVE_AFTER_DAYS),
+    hot_window: int = MESSAGE_HOT_WINDOW,
+    batch_size: int = ARCHIVE_BATCH_SIZE
+) -> int:
+    """
+    Archive cold messages on one database, at most `max_batches` batches,
+    pausing between batches. Returns the number of messages archived, 0 when
+    another process is already archiving the database.
+    """
+    cutoff = datetime.utcnow() - older_than
+    archived = 0
+    batches = 0
+    last_id = 0
+
+    with archive_lock(engine) as acquired, Session(engine) as session:
+        if not acquired:
+            logger.info(f"Archival already running on {engine.url!r}, skipping")
+            return 0
+
+        while batches < max_batches:
+            # Only conversations old or long enough can hold cold messages
+            conversation_ids = session.exec(
+                select(Conversation.id)
+                .where(
+                    or_(Conversation.created_at < cutoff, Conversation.message_count > hot_window),
+                    Conversation.id > last_id
+                )
+                .order_by(Conversation.id)
+                .limit(CONVERSATION_PAGE_SIZE)
+            ).all()
+            if not conversation_ids:
+                break
+
+            for conversation_id in conversation_ids:
+                while batches < max_batches:
+                    count = archive_conversation_batch(
+                        session, conversation_id, cutoff, hot_window, batch_size
+                    )
+                    if not count:
+                        break
+                    archived += count
+                    batches += 1
+                    time.sleep(pause_seconds)
+            last_id = conversation_ids[-1]
+
+    return archived
+
+
+async def archive_periodically(engines: list[Engine]) -> None:
+    """Run the archival job on every engine each ARCHIVE_INTERVAL_SECONDS, off the event loop."""
+    while True:
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+        for engine in engines:
+            try:
+                archived = await asyncio.to_thread(run_archival, engine)
+                if archived:
+                    logger.info(f"Archived {archived} messages on {engine.url!r}")
+            except Exception as e:
+                logger.error(f"Message archival failed on {engine.url!r}: {e}")
+
+
+def main() -> None:
+    from .session import router
+
+    parser = argparse.ArgumentParser(description="Archive cold messages into compressed batches.")
+    parser.add_argument("--max-batches", type=int, default=ARCHIVE_MAX_BATCHES)
+    parser.add_argument("--pause", type=float, default=ARCHIVE_BATCH_PAUSE_SECONDS,
+                        help="seconds to sleep between batches")
+    args = parser.parse_args()
+
+    for engine in router.engines:
+        archived = run_archival(engine, max_batches=args.max_batches, pause_seconds=args.pause)
+        print(f"{engine.url!r}: archived {archived} messages ({CODEC})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Schema setup command.
+
+Creates all tables and the task search indexes on every shard, and
+upgrades tables created by an older version in place (see migrations.py).
+Every step is idempotent. This is
+kept out of the app's startup path so that a cold instance does not issue
+DDL before serving its first request. Run it once per deploy (render.yaml
+does this in its build command), or set CREATE_TABLES_ON_STARTUP=true to
+have the app do it on startup in local development.
+
+Usage (from backend/):
+    python -m src.db.init_db
+"""
+
+from .session import router, create_db_and_tables
+
+
+def main() -> None:
+    create_db_and_tables()
+    print(f"Created tables on {len(router.engines)} shard(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+In-place schema upgrades for tables created by an older version.
+
+create_all only creates missing tables; it never alters one that already
+exists. upgrade_schema adds the columns and indexes introduced since, and
+backfills the denormalized conversation summary from the message table.
+Every step is idempotent, so it runs on each init_db like setup_search.
+"""
+
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .models import PREVIEW_LENGTH
+
+logger = logging.getLogger(__name__)
+
+# Columns added to existing tables: table -> [(column, DDL type)]
+ADDED_COLUMNS = {
+    "conversation": [
+        ("message_count", "INTEGER NOT NULL DEFAULT 0"),
+        ("last_message_preview", "VARCHAR"),
+        ("last_message_at", "TIMESTAMP"),
+        ("last_message_id", "INTEGER"),
+    ],
+}
+
+# Indexes added to existing tables
+ADDED_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_conversation_user_updated "
+    "ON conversation (user_id, updated_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_message_conversation_id ON message (conversation_id)",
+]
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Add missing columns and indexes, then backfill conversation summaries. Safe to run repeatedly."""
+    with engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            if engine.dialect.name == "postgresql":
+                for column, ddl in columns:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {ddl}"))
+                continue
+
+            # SQLite has no ADD COLUMN IF NOT EXISTS
+            existing = {column["name"] for column in inspect(conn).get_columns(table)}
+            for column, ddl in columns:
+                if column not in existing:
+                    logger.warning(f"Adding column {table}.{column}")
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+        for statement in ADDED_INDEXES:
+            conn.execute(text(statement))
+
+        # Conversations created before the summary columns have messages but
+        # a zero count; newer ones are kept in sync by the chat endpoints
+        backfilled = conn.execute(text(
+            "UPDATE conversation SET "
+            "message_count = (SELECT COUNT(*) FROM message WHERE message.conversation_id = conversation.id), "
+            "last_message_id = (SELECT MAX(id) FROM message WHERE message.conversation_id = conversation.id) "
+            "WHERE message_count = 0 "
+            "AND EXISTS (SELECT 1 FROM message WHERE message.conversation_id = conversation.id)"
+        )).rowcount
+        if backfilled:
+            logger.warning(f"Backfilling the summary of {backfilled} conversation(s)")
+            conn.execute(text(
+                "UPDATE conversation SET "
+                "last_message_preview = (SELECT SUBSTR(content, 1, :length) FROM message "
+                "WHERE message.id = conversation.last_message_id), "
+                "last_message_at = (SELECT created_at FROM message "
+                "WHERE message.id = conversation.last_message_id) "
+                "WHERE last_message_id IS NOT NULL AND last_message_at IS NULL"
+            ), {"length": PREVIEW_LENGTH})
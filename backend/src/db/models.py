@@ -12,8 +12,12 @@ Following Section 8.2 Database Models & Migration Prompt:
 from datetime import datetime
 from typing import Optional
 from enum import Enum
+from sqlalchemy import Column, Index, LargeBinary
 from sqlmodel import Field, SQLModel, Relationship
 
+# Maximum length of the denormalized last-message preview on Conversation
+PREVIEW_LENGTH = 200
+
 
 class MessageRole(str, Enum):
     """Message role enum as specified in Section 3"""
@@ -54,13 +58,29 @@ class Conversation(SQLModel, table=True):
     - user_id (string, indexed)
     - created_at (datetime)
     - updated_at (datetime)
+    - message_count (int, denormalized)
+    - last_message_preview (string, nullable, denormalized)
+    - last_message_at (datetime, nullable, denormalized)
+    - last_message_id (int, nullable, denormalized)
+
+    The denormalized summary columns are maintained by the chat endpoint
+    whenever it persists messages, so conversation listings never need
+    to touch the message table.
     """
     __tablename__ = "conversation"
+    __table_args__ = (
+        # Keyset pagination for listings: (user_id, updated_at DESC, id DESC)
+        Index("ix_conversation_user_updated", "user_id", "updated_at", "id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    message_count: int = Field(default=0)
+    last_message_preview: Optional[str] = None
+    last_message_at: Optional[datetime] = None
+    last_message_id: Optional[int] = None
     
     # Relationship to messages
     messages: list["Message"] = Relationship(back_populates="conversation")
@@ -81,7 +101,7 @@ class Message(SQLModel, table=True):
     __tablename__ = "message"
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    conversation_id: int = Field(foreign_key="conversation.id")
+    conversation_id: int = Field(foreign_key="conversation.id", index=True)
     user_id: str
     role: MessageRole
     content: str  # TEXT type in PostgreSQL
@@ -89,3 +109,34 @@ class Message(SQLModel, table=True):
     
     # Relationship to conversation
     conversation: Optional[Conversation] = Relationship(back_populates="messages")
+
+
+class MessageArchive(SQLModel, table=True):
+    """
+    Compressed archive of cold messages.
+
+    Each row holds one archived batch of a conversation's oldest messages as
+    a compressed JSON list. Archived batches always precede the messages
+    still in the message table.
+
+    Fields:
+    - id (int, PK)
+    - conversation_id (FK, indexed)
+    - user_id (string)
+    - first_message_id / last_message_id (int, range of archived message IDs)
+    - message_count (int)
+    - codec (string: zstd | zlib)
+    - payload (bytes)
+    - created_at (datetime)
+    """
+    __tablename__ = "message_archive"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    conversation_id: int = Field(foreign_key="conversation.id", index=True)
+    user_id: str
+    first_message_id: int
+    last_message_id: int
+    message_count: int
+    codec: str
+    payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,145 @@
+"""
+Connection pool and query instrumentation.
+
+InstrumentedQueuePool is a QueuePool that also records how often a
+checkout had to wait because the pool and its overflow were exhausted,
+for how long, and how many of those waits timed out. pool_stats reports
+these counters alongside the pool's live occupancy.
+
+install_query_timing times every statement for the per-request counters
+(query_stats.py) and replaces `echo=True`: it logs statements slower than
+a threshold and, optionally, a random sample of all statements, instead
+of writing every statement synchronously.
+"""
+
+import logging
+import random
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from .query_stats import current_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+class PoolCounters:
+    """Cumulative counters of one engine's pool, kept across pool recreation."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.connects = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that counts checkouts which waited for a connection to be returned."""
+
+    def __init__(self, *args, counters: PoolCounters | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counters = counters or PoolCounters()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.counters = self.counters
+        return pool
+
+    def _do_get(self):
+        # Only a pool with no idle connection and no overflow left blocks
+        exhausted = (
+            self._max_overflow > -1
+            and self.checkedin() == 0
+            and self.overflow() >= self._max_overflow
+        )
+        if not exhausted:
+            return super()._do_get()
+
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.counters.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.counters.waits += 1
+            self.counters.wait_seconds += waited
+            self.counters.max_wait_seconds = max(self.counters.max_wait_seconds, waited)
+
+
+def instrument_pool(engine: Engine) -> PoolCounters:
+    """Count checkouts and new DBAPI connections of an engine's pool, whatever its class."""
+    counters = getattr(engine.pool, "counters", None) or PoolCounters()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        counters.checkouts += 1
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        counters.connects += 1
+
+    return counters
+
+
+def pool_stats(engine: Engine, counters: PoolCounters) -> dict:
+    """Snapshot of an engine's pool occupancy and cumulative counters."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            # Connections opened beyond `size`; negative while the pool is still filling
+            overflow=max(pool.overflow(), 0)
+        )
+
+    stats.update(
+        checkouts=counters.checkouts,
+        connects=counters.connects,
+        waits=counters.waits,
+        wait_seconds=round(counters.wait_seconds, 3),
+        max_wait_seconds=round(counters.max_wait_seconds, 3),
+        timeouts=counters.timeouts
+    )
+    return stats
+
+
+def install_query_timing(engine: Engine, slow_ms: float, sample_rate: float, debug_sample_rate: float) -> None:
+    """
+    Time every statement on `engine` and record it in the active
+    per-request scope (see query_stats). Log statements slower than
+    `slow_ms` at WARNING, each with probability `sample_rate`, and a
+    `debug_sample_rate` fraction of all statements at DEBUG.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+
+        stats = current_query_stats()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+        elapsed_ms = elapsed * 1000
+        if 0 < slow_ms <= elapsed_ms and random.random() < sample_rate:
+            logger.warning(f"Slow query ({elapsed_ms:.1f} ms) on {engine.url!r}: {statement}")
+        elif random.random() < debug_sample_rate:
+            logger.debug(f"Query ({elapsed_ms:.1f} ms) on {engine.url!r}: {statement}")
+
+    @event.listens_for(engine, "handle_error")
+    def discard_timer(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start_time"):
+            connection.info["query_start_time"].pop()
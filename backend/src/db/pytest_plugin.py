@@ -0,0 +1,50 @@
+"""
+Pytest plugin with a fixture for SQL statement budgets.
+
+Enable it from a conftest.py:
+    pytest_plugins = ["src.db.pytest_plugin"]
+
+Then assert how many statements a block may issue, including those made by
+the app while serving TestClient requests inside it:
+
+    def test_list_conversations(client, query_budget):
+        with query_budget(3):
+            client.get("/api/u1/conversations")
+
+    def test_no_n_plus_one(client, query_budget):
+        with query_budget(20, max_repeats=2):
+            client.post("/api/u1/chat/batch", json=payload)
+
+A failed budget reports the most frequent statements.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import pytest
+
+from .query_stats import QueryStats, track_queries
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Context manager factory: query_budget(max_statements, max_repeats=None).
+    Fails the test if the block executes more than `max_statements`
+    statements, or any identical statement more than `max_repeats` times.
+    """
+    @contextmanager
+    def budget(max_statements: int, max_repeats: Optional[int] = None) -> Iterator[QueryStats]:
+        with track_queries() as stats:
+            yield stats
+
+        assert stats.count <= max_statements, (
+            f"Query budget exceeded: {stats.count} > {max_statements} statements\n{stats.summary()}"
+        )
+        if max_repeats is not None:
+            repeated = stats.repeated(max_repeats + 1)
+            assert not repeated, (
+                f"Statement repeated {repeated[0][1]} times (max {max_repeats}), likely N+1\n{stats.summary()}"
+            )
+
+    return budget
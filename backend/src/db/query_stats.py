@@ -0,0 +1,120 @@
+"""
+Per-request SQL statement accounting.
+
+track_queries() opens a tracking scope in a ContextVar. Every statement
+executed on an instrumented engine (see monitoring.install_query_timing)
+while the scope is active is counted and timed. This includes statements
+from sessions opened by the MCP tool handlers, because they run in the
+request's context. Scopes nest: a statement counts toward every enclosing
+scope, so a test can wrap requests that are themselves tracked.
+
+Identical statement text repeated QUERY_REPEAT_THRESHOLD or more times in
+one scope is flagged as a likely N+1 (the same query issued per row
+instead of once for all rows).
+
+query_metrics aggregates finished scopes per endpoint for /debug/db.
+"""
+
+import logging
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+
+
+class QueryStats:
+    """Statements executed within one tracking scope."""
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+        # Sync endpoints and to_thread calls share the scope from worker threads
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            with stats._lock:
+                stats.count += 1
+                stats.seconds += seconds
+                stats.statements[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> list[tuple[str, int]]:
+        """Statements executed at least `threshold` times, most repeated first."""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    def summary(self, limit: int = 10) -> str:
+        """Human-readable breakdown of the most frequent statements."""
+        lines = [f"{self.count} statements in {self.seconds * 1000:.1f} ms"]
+        for statement, count in self.statements.most_common(limit):
+            lines.append(f"  {count:>4} x {' '.join(statement.split())[:200]}")
+        return "\n".join(lines)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """The innermost active tracking scope, if any."""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements executed in this context until the block exits."""
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class QueryMetrics:
+    """Per-endpoint aggregates of finished tracking scopes."""
+
+    def __init__(self):
+        self.endpoints: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, stats: QueryStats) -> list[tuple[str, int]]:
+        """Aggregate one scope; log and return its likely N+1 statements."""
+        repeated = stats.repeated()
+        for statement, count in repeated:
+            logger.warning(f"Possible N+1 in {endpoint}: {count} x {' '.join(statement.split())[:200]}")
+
+        with self._lock:
+            metrics = self.endpoints.setdefault(endpoint, {
+                "requests": 0, "statements": 0, "db_ms": 0.0, "max_statements": 0, "n_plus_one": 0
+            })
+            metrics["requests"] += 1
+            metrics["statements"] += stats.count
+            metrics["db_ms"] += stats.seconds * 1000
+            metrics["max_statements"] = max(metrics["max_statements"], stats.count)
+            metrics["n_plus_one"] += bool(repeated)
+        return repeated
+
+    def snapshot(self) -> dict[str, dict]:
+        """Totals plus per-request means, by endpoint."""
+        with self._lock:
+            return {
+                endpoint: {
+                    **metrics,
+                    "db_ms": round(metrics["db_ms"], 1),
+                    "mean_statements": round(metrics["statements"] / metrics["requests"], 1),
+                    "mean_db_ms": round(metrics["db_ms"] / metrics["requests"], 2)
+                }
+                for endpoint, metrics in self.endpoints.items()
+            }
+
+
+query_metrics = QueryMetrics()
@@ -0,0 +1,99 @@
+"""
+Shard rebalancing command.
+
+After adding, removing or renaming shards (DATABASE_URLS,
+DATABASE_SHARD_NAMES), run this to move every user whose data lives on a
+shard other than the one the router now assigns them to. Each user is
+copied with the streaming export/import (see transfer.py) into their new
+shard and then deleted from the old one, one user at a time.
+
+Changing only a shard's URL (credentials, host) moves no users. Sharded
+deployments that predate shard names were placed by URL and need one run
+after upgrading.
+
+Shards being removed are no longer in DATABASE_URLS; pass them with
+--retiring so their users are moved off as well.
+
+Usage (from backend/):
+    python -m src.db.rebalance [--dry-run] [--retiring URL ...]
+
+Moved users get new task, conversation and message IDs on their new shard.
+Pause writes for the users being moved while this runs. The copy is
+committed before the source rows are deleted, so if the command is
+interrupted between the two steps, re-running it duplicates that user's
+rows on the target.
+"""
+
+import argparse
+import json
+from sqlalchemy import union
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from .models import Task, Conversation
+from .session import router, make_engine, normalize_database_url
+from .transfer import iter_export, NdjsonImporter, delete_user_data
+
+
+def users_on(engine: Engine) -> list[str]:
+    """List every user_id with tasks or conversations on a shard."""
+    query = union(
+        select(Task.user_id).distinct(),
+        select(Conversation.user_id).distinct()
+    )
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(query)]
+
+
+def move_user(user_id: str, source: Engine, target: Engine) -> dict[str, int]:
+    """Copy a user's data from source to target, then delete it from source."""
+    with Session(target) as session:
+        importer = NdjsonImporter(session, user_id)
+        for chunk in iter_export(user_id, source):
+            for line in chunk.splitlines():
+                importer.add(json.loads(line))
+        counts = importer.finish()
+        session.commit()
+
+    with Session(source) as session:
+        delete_user_data(session, user_id)
+        session.commit()
+
+    return counts
+
+
+def rebalance(retiring: list[Engine], dry_run: bool = False) -> int:
+    """Move all misplaced users to their home shard. Returns the number of users moved."""
+    moved = 0
+    for source in router.engines + retiring:
+        for user_id in users_on(source):
+            target = router.engine_for(user_id)
+            if target is source:
+                continue
+
+            print(f"{user_id}: {source.url!r} -> {target.url!r}", end="")
+            if dry_run:
+                print(" (dry run)")
+            else:
+                counts = move_user(user_id, source, target)
+                print(f" ({counts['task']} tasks, {counts['conversation']} conversations, "
+                      f"{counts['message']} messages)")
+            moved += 1
+    return moved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move users to the shard the router assigns them to.")
+    parser.add_argument("--dry-run", action="store_true", help="list moves without performing them")
+    parser.add_argument("--retiring", nargs="*", default=[], metavar="URL",
+                        help="shards being removed from DATABASE_URLS")
+    args = parser.parse_args()
+
+    retiring = [make_engine(normalize_database_url(url)) for url in args.retiring]
+
+    moved = rebalance(retiring, dry_run=args.dry_run)
+    print(f"{'Would move' if args.dry_run else 'Moved'} {moved} users across {len(router.engines)} shards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+User-sharded database routing.
+
+Maps each user_id to one of N database shards with consistent hashing, so
+all of a user's tasks, conversations and messages live on the same shard
+and adding or removing a shard only moves ~1/N of the users.
+
+Each shard gets its own pooled engine, created on first use so that
+importing the app stays cheap. A single configured URL behaves exactly like
+the unsharded setup.
+
+Shards may also have read replicas. Reads routed through read_engine_for
+go to a replica unless the user recently wrote (see record_write). In that
+case they stay on the primary until the pin window expires or, on
+PostgreSQL, until the replica has replayed the write's WAL position.
+Pins are process-local.
+
+Every engine counts the statements it executes (query_counts), which shows
+how much read traffic the replicas take off the primaries, and reports its
+pool's occupancy, checkouts and waits (pool_stats).
+"""
+
+import bisect
+import hashlib
+import itertools
+import threading
+import time
+from typing import Callable
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from .monitoring import PoolCounters, instrument_pool, pool_stats
+
+# Points per shard on the hash ring; more points spread users more evenly
+VIRTUAL_NODES = 128
+# Sweep expired read-your-writes pins once this many are held
+PIN_SWEEP_THRESHOLD = 10_000
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class ShardRouter:
+    """
+    Consistent-hash router from user_id to a shard engine.
+
+    Shards are identified on the ring by name, never by URL, so changing a
+    shard's credentials or host (e.g. to a pooled endpoint) does not move
+    any users. Names default to their position ("shard0", "shard1", ...);
+    give explicit names to remove or reorder shards without renaming the rest.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        engine_factory: Callable[[str], Engine],
+        replica_urls: list[list[str]] | None = None,
+        pin_seconds: float = 5.0,
+        names: list[str] | None = None
+    ):
+        if not urls:
+            raise ValueError("At least one database URL is required")
+        if len(set(urls)) != len(urls):
+            raise ValueError("Database shard URLs must be unique")
+        names = names or [f"shard{index}" for index in range(len(urls))]
+        if len(names) != len(urls):
+            raise ValueError("Configure one shard name per database URL")
+        if len(set(names)) != len(names):
+            raise ValueError("Database shard names must be unique")
+        replica_urls = replica_urls or []
+        if len(replica_urls) > len(urls):
+            raise ValueError("More replica groups configured than database shards")
+
+        self.urls = list(urls)
+        self.names = list(names)
+        self.replica_urls = [
+            replica_urls[index] if index < len(replica_urls) else []
+            for index in range(len(self.urls))
+        ]
+        self._engine_factory = engine_factory
+        self._engines: list[Engine] | None = None
+        self._replicas: list[list[Engine]] = []
+        self._build_lock = threading.Lock()
+        self.pin_seconds = pin_seconds
+        # user_id -> (monotonic deadline, primary WAL LSN or None)
+        self._pins: dict[str, tuple[float, str | None]] = {}
+        self._replica_turns = [itertools.count() for _ in self.urls]
+
+        self.query_counts: dict[str, int] = {}
+        self._labeled_engines: dict[str, tuple[Engine, PoolCounters]] = {}
+
+        ring = sorted(
+            (_hash(f"{name}#{point}"), index)
+            for index, name in enumerate(self.names)
+            for point in range(VIRTUAL_NODES)
+        )
+        self._ring_keys = [key for key, _ in ring]
+        self._ring_shards = [index for _, index in ring]
+
+    @property
+    def engines(self) -> list[Engine]:
+        """Primary engine per shard, in configured order."""
+        if self._engines is None:
+            self._build()
+        return self._engines
+
+    @property
+    def replicas(self) -> list[list[Engine]]:
+        """Replica engines per shard (possibly empty lists)."""
+        if self._engines is None:
+            self._build()
+        return self._replicas
+
+    def _build(self) -> None:
+        with self._build_lock:
+            if self._engines is not None:
+                return
+            engines = [self._engine_factory(url) for url in self.urls]
+            self._replicas = [[self._engine_factory(url) for url in group] for group in self.replica_urls]
+            for index, engine in enumerate(engines):
+                self._instrument(engine, self.names[index])
+                for replica_index, replica in enumerate(self._replicas[index]):
+                    self._instrument(replica, f"{self.names[index]}-replica{replica_index}")
+            self._engines = engines
+
+    def _instrument(self, engine: Engine, label: str) -> None:
+        self.query_counts[label] = 0
+        self._labeled_engines[label] = (engine, instrument_pool(engine))
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count(conn, cursor, statement, parameters, context, executemany):
+            self.query_counts[label] += 1
+
+    def pool_stats(self) -> dict[str, dict]:
+        """Pool occupancy and cumulative checkout/wait counters per engine label."""
+        return {
+            label: pool_stats(engine, counters)
+            for label, (engine, counters) in self._labeled_engines.items()
+        }
+
+    def shard_for(self, user_id: str) -> int:
+        """Return the index of the shard that owns user_id."""
+        if len(self.urls) == 1:
+            return 0
+        position = bisect.bisect(self._ring_keys, _hash(user_id)) % len(self._ring_keys)
+        return self._ring_shards[position]
+
+    def engine_for(self, user_id: str) -> Engine:
+        """Return the pooled engine of the primary that owns user_id."""
+        return self.engines[self.shard_for(user_id)]
+
+    def read_engine_for(self, user_id: str) -> Engine:
+        """
+        Return an engine for reads that may lag slightly behind the primary.
+        Uses the shard's replicas in turn, or the primary while the user is pinned.
+        """
+        shard = self.shard_for(user_id)
+        replicas = self.replicas[shard]
+        if not replicas:
+            return self.engines[shard]
+
+        replica = replicas[next(self._replica_turns[shard]) % len(replicas)]
+
+        pin = self._pins.get(user_id)
+        if pin:
+            deadline, lsn = pin
+            if time.monotonic() < deadline and not (lsn and self._replica_caught_up(replica, lsn)):
+                return self.engines[shard]
+            self._pins.pop(user_id, None)
+
+        return replica
+
+    def record_write(self, user_id: str, session=None) -> None:
+        """
+        Pin the user's reads to the primary after a committed write.
+        On PostgreSQL, pass a primary session to also record the WAL LSN
+        so the pin ends as soon as a replica has replayed it.
+        """
+        shard = self.shard_for(user_id)
+        if not self.replica_urls[shard]:
+            return
+
+        lsn = None
+        if session is not None and self.engines[shard].dialect.name == "postgresql":
+            lsn = session.connection().execute(text("SELECT pg_current_wal_lsn()::text")).scalar()
+
+        if len(self._pins) >= PIN_SWEEP_THRESHOLD:
+            now = time.monotonic()
+            self._pins = {user: pin for user, pin in self._pins.items() if pin[0] > now}
+
+        self._pins[user_id] = (time.monotonic() + self.pin_seconds, lsn)
+
+    def _replica_caught_up(self, replica: Engine, lsn: str) -> bool:
+        try:
+            with replica.connect() as conn:
+                return bool(conn.execute(
+                    text("SELECT pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn)"),
+                    {"lsn": lsn}
+                ).scalar())
+        except DBAPIError:
+            return False
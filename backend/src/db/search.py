@@ -0,0 +1,318 @@
+"""
+Task search indexes for natural-language task references and full-text search.
+
+Backs the find_task tool with the best fuzzy index the database offers:
+- PostgreSQL: pg_trgm GIN index over task.title / task.description
+- SQLite: FTS5 shadow table (task_fts), kept in sync by the mutating tool handlers
+- Otherwise: no index; candidates are scored in-process
+
+For find_task the database index is only used to narrow down candidates; final
+ranking is done in-process by the caller so scores are comparable across backends.
+
+Backs the search_tasks tool with ranked full-text search:
+- PostgreSQL: generated, weighted tsvector column (task.search_vector) with a GIN index
+- SQLite: the same FTS5 shadow table, ranked by bm25
+- Otherwise: in-process scan over the user's tasks
+"""
+
+import logging
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session
+
+logger = logging.getLogger(__name__)
+
+BACKEND_PG_TRGM = "pg_trgm"
+BACKEND_FTS5 = "fts5"
+BACKEND_TSVECTOR = "tsvector"
+BACKEND_PYTHON = "python"
+
+# Detected backends per database URL; detection costs a round trip so it runs once
+_backends: dict[str, str] = {}
+_fulltext_backends: dict[str, str] = {}
+
+# FTS5 tokenizer of task_fts; an index built with another one is rebuilt
+FTS_TOKENIZER = "porter unicode61"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(value: str | None) -> list[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_RE.findall((value or "").lower())
+
+
+def setup_search(engine: Engine) -> str:
+    """
+    Create the search indexes for the engine's dialect, falling back when unavailable.
+    Called after create_all; safe to run repeatedly. An FTS5 table built with
+    an older tokenizer is rebuilt. Returns the fuzzy backend.
+    """
+    key = str(engine.url)
+    backend = BACKEND_PYTHON
+    fulltext = BACKEND_PYTHON
+    dialect = engine.dialect.name
+
+    if dialect == "postgresql":
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_task_title_trgm "
+                    "ON task USING gin (title gin_trgm_ops)"
+                ))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_task_description_trgm "
+                    "ON task USING gin (description gin_trgm_ops)"
+                ))
+            backend = BACKEND_PG_TRGM
+        except DBAPIError as e:
+            logger.warning(f"Task trigram index unavailable, using in-process fallback: {e}")
+
+        try:
+            # Generated column: PostgreSQL keeps it in sync, no handler involvement
+            with engine.begin() as conn:
+                conn.execute(text(
+                    "ALTER TABLE task ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                    "GENERATED ALWAYS AS ("
+                    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+                    ") STORED"
+                ))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_task_search_vector "
+                    "ON task USING gin (search_vector)"
+                ))
+            fulltext = BACKEND_TSVECTOR
+        except DBAPIError as e:
+            logger.warning(f"Task full-text index unavailable, using in-process fallback: {e}")
+
+    elif dialect == "sqlite":
+        try:
+            with engine.begin() as conn:
+                existing = conn.execute(text(
+                    "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'task_fts'"
+                )).first()
+                if existing and FTS_TOKENIZER not in existing[0]:
+                    # Created before stemming; the tokenizer is fixed at creation
+                    logger.warning("Rebuilding task_fts with the stemming tokenizer")
+                    conn.execute(text("DROP TABLE task_fts"))
+                    existing = None
+                if not existing:
+                    conn.execute(text(
+                        "CREATE VIRTUAL TABLE task_fts USING fts5("
+                        "title, description, user_id UNINDEXED, "
+                        f"tokenize = '{FTS_TOKENIZER}')"
+                    ))
+                    # Backfill tasks created before the index existed
+                    conn.execute(text(
+                        "INSERT INTO task_fts (rowid, title, description, user_id) "
+                        "SELECT id, title, COALESCE(description, ''), user_id FROM task"
+                    ))
+            backend = fulltext = BACKEND_FTS5
+        except DBAPIError as e:
+            logger.warning(f"Task FTS5 index unavailable, using in-process fallback: {e}")
+
+    _backends[key] = backend
+    _fulltext_backends[key] = fulltext
+    return backend
+
+
+def search_backend(session: Session) -> str:
+    """Return the search backend for the session's database, detecting it on first use."""
+    engine = session.get_bind()
+    key = str(engine.url)
+
+    if key not in _backends:
+        backend = BACKEND_PYTHON
+        if engine.dialect.name == "postgresql":
+            if session.exec(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first():
+                backend = BACKEND_PG_TRGM
+        elif engine.dialect.name == "sqlite":
+            if session.exec(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_fts'"
+            )).first():
+                backend = BACKEND_FTS5
+        _backends[key] = backend
+
+    return _backends[key]
+
+
+def fulltext_backend(session: Session) -> str:
+    """Return the full-text backend for the session's database, detecting it on first use."""
+    engine = session.get_bind()
+    key = str(engine.url)
+
+    if key not in _fulltext_backends:
+        backend = BACKEND_PYTHON
+        if engine.dialect.name == "postgresql":
+            if session.exec(text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'task' AND column_name = 'search_vector'"
+            )).first():
+                backend = BACKEND_TSVECTOR
+        elif search_backend(session) == BACKEND_FTS5:
+            backend = BACKEND_FTS5
+        _fulltext_backends[key] = backend
+
+    return _fulltext_backends[key]
+
+
+def index_task(session: Session, task) -> None:
+    """
+    Add or refresh a task in the search index within the session's transaction.
+    The task must already be flushed so that its ID is assigned.
+    """
+    if search_backend(session) != BACKEND_FTS5:
+        return
+
+    session.exec(text("DELETE FROM task_fts WHERE rowid = :id").bindparams(id=task.id))
+    session.exec(text(
+        "INSERT INTO task_fts (rowid, title, description, user_id) "
+        "VALUES (:id, :title, :description, :user_id)"
+    ).bindparams(
+        id=task.id,
+        title=task.title,
+        description=task.description or "",
+        user_id=task.user_id
+    ))
+
+
+def index_task_rows(session: Session, rows: list[dict]) -> None:
+    """
+    Add newly inserted tasks to the search index in one multi-row statement.
+    Each row needs id, title, description and user_id.
+    """
+    if not rows or search_backend(session) != BACKEND_FTS5:
+        return
+
+    session.connection().execute(
+        text(
+            "INSERT INTO task_fts (rowid, title, description, user_id) "
+            "VALUES (:id, :title, :description, :user_id)"
+        ),
+        [
+            {
+                "id": row["id"],
+                "title": row["title"],
+                "description": row["description"] or "",
+                "user_id": row["user_id"],
+            }
+            for row in rows
+        ]
+    )
+
+
+def unindex_task(session: Session, task_id: int) -> None:
+    """Remove a task from the search index within the session's transaction."""
+    if search_backend(session) != BACKEND_FTS5:
+        return
+
+    session.exec(text("DELETE FROM task_fts WHERE rowid = :id").bindparams(id=task_id))
+
+
+def unindex_user(session: Session, user_id: str) -> None:
+    """Remove all of a user's tasks from the search index within the session's transaction."""
+    if search_backend(session) != BACKEND_FTS5:
+        return
+
+    session.exec(text("DELETE FROM task_fts WHERE user_id = :user_id").bindparams(user_id=user_id))
+
+
+def candidate_task_ids(session: Session, user_id: str, query: str, limit: int) -> list[int] | None:
+    """
+    Narrow the user's tasks down to likely matches for `query` using the index.
+    Returns None when the caller should scan instead: no index is available,
+    the query has no word tokens (only punctuation) for the index to match,
+    or the index found nothing. The last case covers misspelled references
+    that the in-process scorer still accepts, so every backend resolves the
+    same references.
+    """
+    backend = search_backend(session)
+    tokens = tokenize(query)
+    if backend in (BACKEND_PG_TRGM, BACKEND_FTS5) and not tokens:
+        return None
+
+    if backend == BACKEND_PG_TRGM:
+        # Compare the bare columns so each side can use its trigram index
+        # (a NULL description simply does not match)
+        rows = session.exec(text(
+            "SELECT id FROM task "
+            "WHERE user_id = :user_id "
+            "AND (:query <% title OR :query <% description) "
+            "ORDER BY GREATEST("
+            "word_similarity(:query, title), "
+            "word_similarity(:query, COALESCE(description, '')) * 0.5"
+            ") DESC "
+            "LIMIT :limit"
+        ).bindparams(user_id=user_id, query=query, limit=limit)).all()
+        # <% requires a word similarity of 0.6, well above find_task's
+        # MIN_SCORE; on a miss, scan and score in-process as FTS5 does
+        return [row[0] for row in rows] or None
+
+    if backend == BACKEND_FTS5:
+        # Prefix-match any token so partial words ("dent") still find candidates
+        match = " OR ".join(f'"{token}"*' for token in tokens)
+        rows = session.exec(text(
+            "SELECT rowid FROM task_fts "
+            "WHERE task_fts MATCH :match AND user_id = :user_id "
+            "ORDER BY bm25(task_fts, 10.0, 1.0) "
+            "LIMIT :limit"
+        ).bindparams(match=match, user_id=user_id, limit=limit)).all()
+        # FTS5 only matches whole tokens and prefixes, so misspelled
+        # references fall back to a scan instead of finding nothing
+        return [row[0] for row in rows] or None
+
+    return None
+
+
+def fulltext_search(
+    session: Session,
+    user_id: str,
+    query: str,
+    completed: bool | None,
+    limit: int,
+    offset: int
+) -> list[tuple[int, float]] | None:
+    """
+    Rank the user's tasks containing every word of `query`.
+    Returns (task_id, rank) pairs, best first, or None when no index is
+    available and the caller should scan.
+    """
+    backend = fulltext_backend(session)
+    status_filter = ""
+    params = {"user_id": user_id, "limit": limit, "offset": offset}
+    if completed is not None:
+        status_filter = "AND task.completed = :completed "
+        params["completed"] = completed
+
+    if backend == BACKEND_TSVECTOR:
+        rows = session.exec(text(
+            "SELECT task.id, ts_rank_cd(task.search_vector, query) AS rank "
+            "FROM task, websearch_to_tsquery('english', :query) AS query "
+            "WHERE task.user_id = :user_id AND task.search_vector @@ query "
+            + status_filter +
+            "ORDER BY rank DESC, task.id DESC "
+            "LIMIT :limit OFFSET :offset"
+        ).bindparams(query=query, **params)).all()
+        return [(row[0], float(row[1])) for row in rows]
+
+    if backend == BACKEND_FTS5:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Quote each token so user input cannot inject FTS5 query syntax
+        match = " ".join(f'"{token}"' for token in tokens)
+        rows = session.exec(text(
+            "SELECT task.id, -bm25(task_fts, 10.0, 1.0) AS rank "
+            "FROM task_fts JOIN task ON task.id = task_fts.rowid "
+            "WHERE task_fts MATCH :match AND task_fts.user_id = :user_id "
+            + status_filter +
+            "ORDER BY bm25(task_fts, 10.0, 1.0), task.id DESC "
+            "LIMIT :limit OFFSET :offset"
+        ).bindparams(match=match, **params)).all()
+        return [(row[0], float(row[1])) for row in rows]
+
+    return None
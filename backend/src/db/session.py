@@ -1,43 +1,161 @@
 """
 Database session and engine configuration.
 Stateless database access following Section 2.2 Statelessness Model.
+
+Users are sharded across one or more databases (see router.py). Configure
+either a single DATABASE_URL or a comma-separated DATABASE_URLS list; every
+session is opened against the shard that owns the request's user_id.
+Users are assigned by shard name, not URL: DATABASE_SHARD_NAMES gives one
+name per DATABASE_URLS entry and defaults to "shard0", "shard1", ...
+
+Optional read replicas are configured with DATABASE_REPLICA_URLS: one
+comma-separated entry per shard, in DATABASE_URLS order, with several
+replicas of the same shard separated by "|" and an empty entry for a shard
+without replicas. After a write, a user's reads stay on the primary for
+READ_YOUR_WRITES_SECONDS (default 5) or until the replica catches up.
+
+Every worker process opens one pool per engine, so a deployment holds up to
+workers x engines x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections. Size the
+pool to fit the database's connection limit. Alternatively, set
+DB_POOL_MODE=null to open a connection per checkout when connecting through
+PgBouncer in transaction mode (e.g. Neon's "-pooler" endpoint), which does
+the pooling instead.
 """
 
 from sqlmodel import create_engine, SQLModel, Session
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from .monitoring import InstrumentedQueuePool, install_query_timing
+from .router import ShardRouter
+
+# "queue" keeps a pool per worker; "null" defers pooling to PgBouncer
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# Recycling before Neon's 5 minute idle suspend replaces most pre-pings
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "240"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+
+# Replaces echo=True: log slow statements (0 disables) and a sample of all of them
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1"))
+QUERY_LOG_SAMPLE_RATE = float(os.getenv("QUERY_LOG_SAMPLE_RATE", "0"))
+
+if DB_POOL_MODE not in ("queue", "null"):
+    raise ValueError(f"DB_POOL_MODE must be 'queue' or 'null', not {DB_POOL_MODE!r}")
+
+
+def normalize_database_url(url: str) -> str:
+    """Use "postgresql+psycopg2://" for SQLAlchemy if the string starts with "postgres://"."""
+    url = url.strip()
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+psycopg2://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+psycopg2://", 1)
+    return url
 
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-if not DATABASE_URL:
+def make_engine(url: str) -> Engine:
+    """Create the engine for one shard or replica, pooled per the DB_POOL_* settings."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's default pool
+        engine = create_engine(url)
+    elif DB_POOL_MODE == "null":
+        engine = create_engine(url, poolclass=NullPool)
+    else:
+        engine = create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING
+        )
+
+    install_query_timing(engine, SLOW_QUERY_MS, SLOW_QUERY_SAMPLE_RATE, QUERY_LOG_SAMPLE_RATE)
+    return engine
+
+
+DATABASE_URLS = [
+    normalize_database_url(url)
+    for url in (os.getenv("DATABASE_URLS") or os.getenv("DATABASE_URL") or "").split(",")
+    if url.strip()
+]
+
+if not DATABASE_URLS:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-# Use "postgresql+psycopg2://" for SQLAlchemy if the string starts with "postgres://"
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+psycopg2://", 1)
-elif DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1)
-
-# Neon/Serverless optimization: pool_pre_ping checks connection health before use
-engine = create_engine(
-    DATABASE_URL, 
-    echo=True, 
-    pool_pre_ping=True, 
-    pool_recycle=300  # Recycle connections every 5 minutes
+DATABASE_REPLICA_URLS = [
+    [normalize_database_url(url) for url in group.split("|") if url.strip()]
+    for group in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+]
+
+DATABASE_SHARD_NAMES = [
+    name.strip() for name in os.getenv("DATABASE_SHARD_NAMES", "").split(",") if name.strip()
+] or None
+
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+router = ShardRouter(
+    DATABASE_URLS,
+    make_engine,
+    replica_urls=DATABASE_REPLICA_URLS,
+    pin_seconds=READ_YOUR_WRITES_SECONDS,
+    names=DATABASE_SHARD_NAMES
 )
 
 
-def get_session():
+def get_engine(user_id: str) -> Engine:
+    """Get the primary engine of the shard that owns user_id."""
+    return router.engine_for(user_id)
+
+
+def get_read_engine(user_id: str) -> Engine:
+    """Get an engine for reads that tolerate replica lag (a replica when available)."""
+    return router.read_engine_for(user_id)
+
+
+def record_write(user_id: str, session: Session | None = None) -> None:
+    """
+    Pin the user's reads to the primary after committing a write.
+    Pass the primary session so replica catch-up can end the pin early.
+    """
+    router.record_write(user_id, session)
+
+
+def get_session(user_id: str):
     """
     Get database session for dependency injection.
     Stateless per Section 2.2 - no in-memory session state.
+    The session is bound to the shard of the user_id path parameter.
     """
-    with Session(engine) as session:
+    with Session(get_engine(user_id)) as session:
+        yield session
+
+
+def get_read_session(user_id: str):
+    """
+    Get a read-only database session for dependency injection.
+    Bound to a replica of the user's shard when one is configured.
+    """
+    with Session(get_read_engine(user_id)) as session:
         yield session
 
 
 def create_db_and_tables():
-    """Create all database tables from SQLModel metadata."""
-    SQLModel.metadata.create_all(engine)
+    """
+    Create all database tables from SQLModel metadata on every shard, upgrade
+    tables created by older versions, and set up the task search index.
+    """
+    from .migrations import upgrade_schema
+    from .search import setup_search
+
+    for engine in router.engines:
+        SQLModel.metadata.create_all(engine)
+        upgrade_schema(engine)
+        setup_search(engine)
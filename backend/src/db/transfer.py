@@ -0,0 +1,305 @@
+"""
+Streaming NDJSON export/import of a user's data.
+
+Moves a user's tasks, conversations and messages as NDJSON, one JSON
+record per line, in this order:
+
+    {"type": "export", "version": 1, "user_id": ...}
+    {"type": "task", "id": ..., "title": ..., ...}
+    {"type": "conversation", "id": ..., ...}
+    {"type": "message", "id": ..., "conversation_id": ..., ...}
+
+Export streams rows from server-side cursors (yield_per), so memory stays
+constant regardless of account size. Messages are ordered by conversation
+and ID: archived messages, decompressed one batch at a time, are merged
+with the hot ones, so each conversation's messages are contiguous and in
+their original order. They are imported back as regular messages.
+
+Import writes batched multi-row inserts in a single transaction. The body
+is parsed on the event loop; the inserts run in a worker thread one batch
+of records at a time, so a large import does not stall other requests.
+Records are re-keyed on import: every row gets a new ID, and messages are re-pointed at
+their imported conversation. Malformed input raises ValueError.
+
+Used by the export/import endpoints and the shard rebalancing command.
+"""
+
+from sqlalchemy import insert, update, delete, func
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from typing import AsyncIterator, Iterator
+from datetime import datetime
+import asyncio
+import heapq
+import itertools
+import json
+
+from .models import Task, Conversation, Message, MessageRole, MessageArchive
+from .archive import iter_archived_messages
+from .session import get_engine, record_write
+from .search import index_task_rows, unindex_user
+
+EXPORT_FORMAT_VERSION = 1
+# Rows fetched per server-side cursor round trip during export
+EXPORT_BATCH_SIZE = 1000
+# Rows per multi-row INSERT during import
+IMPORT_BATCH_SIZE = 1000
+
+def _serialize(value):
+    """JSON encoder hook for datetimes and enums in exported rows."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, MessageRole):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def iter_export(user_id: str, source: Engine | None = None) -> Iterator[bytes]:
+    """
+    Yield the user's data as NDJSON chunks, one chunk per fetched batch.
+    Rows come from server-side cursors and are never materialized as a whole.
+    Reads from the user's shard unless another `source` engine is given.
+    """
+    task_columns = [
+        Task.id, Task.title, Task.description, Task.completed,
+        Task.created_at, Task.updated_at
+    ]
+    conversation_columns = [
+        Conversation.id, Conversation.created_at, Conversation.updated_at,
+        Conversation.message_count, Conversation.last_message_preview,
+        Conversation.last_message_at
+    ]
+    message_columns = [
+        Message.id, Message.conversation_id, Message.role,
+        Message.content, Message.created_at
+    ]
+
+    queries = [
+        ("task", select(*task_columns)
+            .where(Task.user_id == user_id)
+            .order_by(Task.id)),
+        ("conversation", select(*conversation_columns)
+            .where(Conversation.user_id == user_id)
+            .order_by(Conversation.id)),
+        ("message", select(*message_columns)
+            .join(Conversation, Message.conversation_id == Conversation.id)
+            .where(Conversation.user_id == user_id)
+            .order_by(Message.conversation_id, Message.id)),
+    ]
+
+    header = {"type": "export", "version": EXPORT_FORMAT_VERSION, "user_id": user_id}
+    yield (json.dumps(header) + "\n").encode()
+
+    with (source or get_engine(user_id)).connect() as conn:
+        for record_type, query in queries:
+            result = conn.execution_options(yield_per=EXPORT_BATCH_SIZE).execute(query)
+            if record_type == "message":
+                # Both streams are ordered by conversation and ID; interleave them
+                messages = heapq.merge(
+                    iter_archived_messages(conn, user_id),
+                    (row._asdict() for row in result),
+                    key=lambda message: (message["conversation_id"], message["id"])
+                )
+                while batch := list(itertools.islice(messages, EXPORT_BATCH_SIZE)):
+                    yield "".join(
+                        json.dumps({"type": "message", **data}, default=_serialize) + "\n"
+                        for data in batch
+                    ).encode()
+                continue
+
+            for partition in result.partitions():
+                yield "".join(
+                    json.dumps({"type": record_type, **row._asdict()}, default=_serialize) + "\n"
+                    for row in partition
+                ).encode()
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    """Parse a stream of byte chunks into NDJSON records without buffering the body."""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield _parse_line(line, line_number)
+    if buffer.strip():
+        yield _parse_line(buffer, line_number + 1)
+
+
+def _parse_line(line: bytes, line_number: int) -> dict:
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        raise ValueError(f"Invalid JSON on line {line_number}")
+    if not isinstance(record, dict) or "type" not in record:
+        raise ValueError(f"Missing record type on line {line_number}")
+    return record
+
+
+class NdjsonImporter:
+    """
+    Buffers parsed records and writes them in multi-row inserts.
+    Holds only the current batch plus the old -> new conversation ID map.
+    """
+
+    def __init__(self, session: Session, user_id: str):
+        self.session = session
+        self.user_id = user_id
+        self.batches: dict[str, list[dict]] = {"task": [], "conversation": [], "message": []}
+        self.conversation_ids: dict[int, int] = {}
+        self.counts = {"task": 0, "conversation": 0, "message": 0}
+
+    def add(self, record: dict) -> None:
+        record_type = record.get("type")
+        if record_type == "export":
+            if record.get("version") != EXPORT_FORMAT_VERSION:
+                raise ValueError("Unsupported export version")
+            return
+        if record_type not in self.batches:
+            raise ValueError(f"Unknown record type: {record_type}")
+
+        # Messages need their conversations inserted first to re-key them
+        if record_type == "message" and self.batches["conversation"]:
+            self.flush("conversation")
+
+        batch = self.batches[record_type]
+        batch.append(record)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            self.flush(record_type)
+
+    def add_all(self, records: list[dict]) -> None:
+        for record in records:
+            self.add(record)
+
+    def flush(self, record_type: str) -> None:
+        batch = self.batches[record_type]
+        if not batch:
+            return
+        getattr(self, f"_insert_{record_type}s")(batch)
+        self.counts[record_type] += len(batch)
+        self.batches[record_type] = []
+
+    def finish(self) -> dict[str, int]:
+        for record_type in self.batches:
+            self.flush(record_type)
+        self._refresh_last_message_ids()
+        return self.counts
+
+    def _insert_tasks(self, batch: list[dict]) -> None:
+        rows = [
+            {
+                "user_id": self.user_id,
+                "title": record["title"],
+                "description": record.get("description"),
+                "completed": bool(record.get("completed", False)),
+                "created_at": _parse_datetime(record.get("created_at")) or datetime.utcnow(),
+                "updated_at": _parse_datetime(record.get("updated_at")) or datetime.utcnow(),
+            }
+            for record in batch
+        ]
+        result = self.session.connection().execute(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True), rows
+        )
+        for row, new_id in zip(rows, result.scalars()):
+            row["id"] = new_id
+        index_task_rows(self.session, rows)
+
+    def _insert_conversations(self, batch: list[dict]) -> None:
+        rows = [
+            {
+                "user_id": self.user_id,
+                "created_at": _parse_datetime(record.get("created_at")) or datetime.utcnow(),
+                "updated_at": _parse_datetime(record.get("updated_at")) or datetime.utcnow(),
+                "message_count": int(record.get("message_count") or 0),
+                "last_message_preview": record.get("last_message_preview"),
+                "last_message_at": _parse_datetime(record.get("last_message_at")),
+            }
+            for record in batch
+        ]
+        result = self.session.connection().execute(
+            insert(Conversation).returning(Conversation.id, sort_by_parameter_order=True), rows
+        )
+        for record, new_id in zip(batch, result.scalars()):
+            self.conversation_ids[record["id"]] = new_id
+
+    def _insert_messages(self, batch: list[dict]) -> None:
+        rows = []
+        for record in batch:
+            conversation_id = self.conversation_ids.get(record.get("conversation_id"))
+            if conversation_id is None:
+                raise ValueError(f"Message {record.get('id')} references an unknown conversation")
+            rows.append({
+                "conversation_id": conversation_id,
+                "user_id": self.user_id,
+                "role": MessageRole(record["role"]),
+                "content": record["content"],
+                "created_at": _parse_datetime(record.get("created_at")) or datetime.utcnow(),
+            })
+        self.session.connection().execute(insert(Message), rows)
+
+    def _refresh_last_message_ids(self) -> None:
+        """Point imported conversations' last_message_id at their re-keyed messages."""
+        new_ids = list(self.conversation_ids.values())
+        for start in range(0, len(new_ids), IMPORT_BATCH_SIZE):
+            chunk = new_ids[start:start + IMPORT_BATCH_SIZE]
+            last_message_id = (
+                select(func.max(Message.id))
+                .where(Message.conversation_id == Conversation.id)
+                .scalar_subquery()
+            )
+            self.session.connection().execute(
+                update(Conversation)
+                .where(Conversation.id.in_(chunk))
+                .values(last_message_id=last_message_id)
+            )
+
+
+def delete_user_data(session: Session, user_id: str) -> None:
+    """Delete all of the user's tasks, conversations and messages within the session's transaction."""
+    conversation_ids = select(Conversation.id).where(Conversation.user_id == user_id)
+    connection = session.connection()
+    connection.execute(delete(Message).where(Message.conversation_id.in_(conversation_ids)))
+    connection.execute(delete(MessageArchive).where(MessageArchive.conversation_id.in_(conversation_ids)))
+    connection.execute(delete(Conversation).where(Conversation.user_id == user_id))
+    connection.execute(delete(Task).where(Task.user_id == user_id))
+    unindex_user(session, user_id)
+
+
+async def import_ndjson(
+    user_id: str,
+    chunks: AsyncIterator[bytes],
+    target: Engine | None = None
+) -> dict[str, int]:
+    """
+    Ingest an NDJSON export for the user in a single transaction.
+    Writes to the user's shard unless another `target` engine is given.
+    Returns the number of imported rows per record type.
+    """
+    def commit() -> None:
+        session.commit()
+        if target is None:
+            record_write(user_id, session)
+
+    with Session(target or get_engine(user_id)) as session:
+        importer = NdjsonImporter(session, user_id)
+        try:
+            # Database work runs off the event loop, one batch of records at a time
+            records = []
+            async for record in iter_ndjson(chunks):
+                records.append(record)
+                if len(records) >= IMPORT_BATCH_SIZE:
+                    await asyncio.to_thread(importer.add_all, records)
+                    records = []
+            await asyncio.to_thread(importer.add_all, records)
+            counts = await asyncio.to_thread(importer.finish)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid record: {e}")
+        await asyncio.to_thread(commit)
+    return counts
@@ -9,19 +9,64 @@ FastAPI application with:
 - MCP tools (Section 4)
 """
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import logging
+import os
+import secrets
 
-from .db import create_db_and_tables
-from .api import chat_router
+from .db import create_db_and_tables, router as db_router, query_metrics
+from .db.archive import ARCHIVE_INTERVAL_SECONDS, archive_periodically
+from .api import chat_router, conversations_router, transfer_router, batch_router, chat_ws_router
+from .api import QueryStatsMiddleware, MemoryProfileMiddleware
+from .profiling import memory_profiler
+from .agent import get_client, agent_metrics
+
+logger = logging.getLogger(__name__)
+
+# Schema setup normally runs as `python -m src.db.init_db`, outside the startup path
+CREATE_TABLES_ON_STARTUP = os.getenv("CREATE_TABLES_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+# Bearer token for the /debug/* endpoints; unset (the default) disables them
+DEBUG_ADMIN_TOKEN = os.getenv("DEBUG_ADMIN_TOKEN", "")
+
+
+def warm_up() -> None:
+    """
+    Build the database engines and the Cohere client, and open one
+    connection per shard (waking a suspended Neon compute), so that the
+    first chat request does not pay for them.
+    """
+    for engine in db_router.engines:
+        try:
+            with engine.connect():
+                pass
+        except Exception as e:
+            logger.warning(f"Warm-up connection to {engine.url!r} failed: {e}")
+    get_client()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database tables on startup"""
-    create_db_and_tables()
+    """
+    Start serving immediately; warm up connections and clients in the
+    background, and start message archival if enabled
+    """
+    if CREATE_TABLES_ON_STARTUP:
+        create_db_and_tables()
+    
+    warming = asyncio.create_task(asyncio.to_thread(warm_up))
+    
+    archiver = None
+    if ARCHIVE_INTERVAL_SECONDS > 0:
+        archiver = asyncio.create_task(archive_periodically(db_router.engines))
+    
     yield
+    
+    if archiver:
+        archiver.cancel()
+    warming.cancel()
 
 
 app = FastAPI(
@@ -45,9 +90,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL statement counts, N+1 warnings and optional debug headers
+app.add_middleware(QueryStatsMiddleware)
+# Sampled tracemalloc peaks per endpoint and tool (opt-in, MEMORY_PROFILE_SAMPLE_RATE)
+app.add_middleware(MemoryProfileMiddleware)
+
 # Include chat router per Section 8.6
 # Note: user_id is a path parameter in the route itself
 app.include_router(chat_router, tags=["chat"])
+app.include_router(batch_router, tags=["chat"])
+app.include_router(chat_ws_router, tags=["chat"])
+app.include_router(conversations_router, tags=["conversations"])
+app.include_router(transfer_router, tags=["export"])
 
 
 @app.get("/")
@@ -57,7 +111,13 @@ async def root():
         "version": "3.0.0",
         "architecture": "Agentic Dev Stack (OpenAI + MCP)",
         "endpoints": {
-            "chat": "POST /api/{user_id}/chat"
+            "chat": "POST /api/{user_id}/chat",
+            "chat_batch": "POST /api/{user_id}/chat/batch",
+            "chat_ws": "WS /ws/{user_id}/chat",
+            "conversations": "GET /api/{user_id}/conversations",
+            "messages": "GET /api/{user_id}/conversations/{conversation_id}/messages",
+            "export": "GET /api/{user_id}/export",
+            "import": "POST /api/{user_id}/import"
         }
     }
 
@@ -65,3 +125,55 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "mode": "stateless"}
+
+
+def require_admin(authorization: str = Header(default="")) -> None:
+    """
+    Guard for the /debug/* endpoints: 404 unless DEBUG_ADMIN_TOKEN is set,
+    401 unless the request carries it as "Authorization: Bearer <token>".
+    """
+    if not DEBUG_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(authorization.encode(), f"Bearer {DEBUG_ADMIN_TOKEN}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@app.get("/debug/db", dependencies=[Depends(require_admin)])
+async def debug_db():
+    """
+    Statements executed per primary and replica engine since startup, and
+    per-endpoint statement counts, DB time and likely N+1 requests.
+    """
+    return {"query_counts": db_router.query_counts, "endpoints": query_metrics.snapshot()}
+
+
+@app.get("/debug/pool", dependencies=[Depends(require_admin)])
+async def debug_pool():
+    """Connection pool occupancy, checkouts, waits and overflow per engine."""
+    return {"pools": db_router.pool_stats()}
+
+
+@app.get("/debug/agent", dependencies=[Depends(require_admin)])
+async def debug_agent():
+    """
+    Agent runs and tool calls since startup, tool results reused from the
+    per-run memo, and runs that exhausted their step or time budget.
+    """
+    return agent_metrics.snapshot()
+
+
+@app.get("/debug/memory", dependencies=[Depends(require_admin)])
+async def debug_memory(top: int = 20):
+    """
+    Sampled tracemalloc profile: peak allocation per endpoint and per tool,
+    and the top allocation sites.
+    """
+    return memory_profiler.report(top)
+
+
+@app.post("/debug/memory/reset", dependencies=[Depends(require_admin)])
+async def reset_debug_memory(top: int = 20):
+    """Return the current memory profile and start a new window."""
+    report = memory_profiler.report(top)
+    memory_profiler.reset()
+    return report
@@ -4,13 +4,13 @@ Provides stateless database access per Section 2.2.
 """
 
 from sqlmodel import Session
-from ..db.session import engine
+from ..db.session import get_engine
 
 
-def get_db_session() -> Session:
+def get_db_session(user_id: str) -> Session:
     """
     Dependency injection for database session in MCP tools.
-    Stateless: each tool invocation gets a fresh session.
+    Stateless: each tool invocation gets a fresh session on the user's shard.
     """
-    with Session(engine) as session:
+    with Session(get_engine(user_id)) as session:
         yield session
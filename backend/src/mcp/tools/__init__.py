@@ -1,10 +1,12 @@
-"""MCP-style Tools package initialization - all 5 task operation tools"""
+"""MCP-style Tools package initialization - all task operation tools"""
 
 from .add_task import add_task_handler, AddTaskInput, AddTaskOutput
 from .list_tasks import list_tasks_handler, ListTasksInput, ListTasksOutput
 from .complete_task import complete_task_handler, CompleteTaskInput, CompleteTaskOutput
 from .delete_task import delete_task_handler, DeleteTaskInput, DeleteTaskOutput
 from .update_task import update_task_handler, UpdateTaskInput, UpdateTaskOutput
+from .find_task import find_task_handler, FindTaskInput, FindTaskOutput, TaskCandidate, resolve_task
+from .search_tasks import search_tasks_handler, SearchTasksInput, SearchTasksOutput, SearchTaskItem
 
 # Export all handlers per Section 4 contract
 __all__ = [
@@ -28,4 +30,15 @@ __all__ = [
     "update_task_handler",
     "UpdateTaskInput",
     "UpdateTaskOutput",
+    # find_task
+    "find_task_handler",
+    "FindTaskInput",
+    "FindTaskOutput",
+    "TaskCandidate",
+    "resolve_task",
+    # search_tasks
+    "search_tasks_handler",
+    "SearchTasksInput",
+    "SearchTasksOutput",
+    "SearchTaskItem",
 ]
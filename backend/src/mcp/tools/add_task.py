@@ -14,7 +14,8 @@ from pydantic import BaseModel
 from sqlmodel import Session
 from datetime import datetime
 from ...db.models import Task
-from ...db.session import engine
+from ...db.session import get_engine, record_write
+from ...db.search import index_task
 
 
 class AddTaskInput(BaseModel):
@@ -41,7 +42,7 @@ async def add_task_handler(user_id: str, title: str, description: str | None = N
     - Input: user_id, title, description?
     - Output: task_id, status=created, title
     """
-    with Session(engine) as session:
+    with Session(get_engine(user_id)) as session:
         # Create new task
         task = Task(
             user_id=user_id,
@@ -53,7 +54,10 @@ async def add_task_handler(user_id: str, title: str, description: str | None = N
         )
         
         session.add(task)
+        session.flush()
+        index_task(session, task)
         session.commit()
+        record_write(user_id, session)
         session.refresh(task)
         
         # Return structured output per Section 4
@@ -6,14 +6,15 @@ Implements Section 4: MCP Tool Contract - complete_task
 from pydantic import BaseModel
 from sqlmodel import Session
 from datetime import datetime
-from ...db.models import Task
-from ...db.session import engine
+from ...db.session import get_engine, record_write
+from .find_task import resolve_task
 
 
 class CompleteTaskInput(BaseModel):
     """Input schema for complete_task tool per Section 4"""
     user_id: str
-    task_id: int
+    task_id: int | None = None
+    task_title: str | None = None
 
 
 class CompleteTaskOutput(BaseModel):
@@ -23,25 +24,22 @@ class CompleteTaskOutput(BaseModel):
     title: str
 
 
-async def complete_task_handler(user_id: str, task_id: int) -> CompleteTaskOutput:
+async def complete_task_handler(
+    user_id: str,
+    task_id: int | None = None,
+    task_title: str | None = None
+) -> CompleteTaskOutput:
     """
     MCP-style tool handler for completing tasks.
     
     Per Section 4 specification:
     - Trigger: done/complete/finished
-    - Input: user_id, task_id
+    - Input: user_id, task_id (or task_title reference)
     - Output: task_id, status=completed, title
     """
-    with Session(engine) as session:
-        # Fetch task
-        task = session.get(Task, task_id)
-        
-        if not task:
-            raise ValueError(f"Task {task_id} not found")
-        
-        # Validate ownership
-        if task.user_id != user_id:
-            raise ValueError(f"Task {task_id} does not belong to user {user_id}")
+    with Session(get_engine(user_id)) as session:
+        # Fetch task by ID or title reference and validate ownership
+        task = resolve_task(session, user_id, task_id, task_title)
         
         # Mark as completed
         task.completed = True
@@ -49,6 +47,7 @@ async def complete_task_handler(user_id: str, task_id: int) -> CompleteTaskOutpu
         
         session.add(task)
         session.commit()
+        record_write(user_id, session)
         session.refresh(task)
         
         # Return structured output per Section 4
@@ -5,14 +5,16 @@ Implements Section 4: MCP Tool Contract - delete_task
 
 from pydantic import BaseModel
 from sqlmodel import Session
-from ...db.models import Task
-from ...db.session import engine
+from ...db.session import get_engine, record_write
+from ...db.search import unindex_task
+from .find_task import resolve_task
 
 
 class DeleteTaskInput(BaseModel):
     """Input schema for delete_task tool per Section 4"""
     user_id: str
-    task_id: int
+    task_id: int | None = None
+    task_title: str | None = None
 
 
 class DeleteTaskOutput(BaseModel):
@@ -22,25 +24,22 @@ class DeleteTaskOutput(BaseModel):
     title: str
 
 
-async def delete_task_handler(user_id: str, task_id: int) -> DeleteTaskOutput:
+async def delete_task_handler(
+    user_id: str,
+    task_id: int | None = None,
+    task_title: str | None = None
+) -> DeleteTaskOutput:
     """
     MCP-style tool handler for deleting tasks.
     
     Per Section 4 specification:
     - Trigger: delete/remove/cancel
-    - Input: user_id, task_id
+    - Input: user_id, task_id (or task_title reference)
     - Output: task_id, status=deleted, title
     """
-    with Session(engine) as session:
-        # Fetch task
-        task = session.get(Task, task_id)
-        
-        if not task:
-            raise ValueError(f"Task {task_id} not found")
-        
-        # Validate ownership
-        if task.user_id != user_id:
-            raise ValueError(f"Task {task_id} does not belong to user {user_id}")
+    with Session(get_engine(user_id)) as session:
+        # Fetch task by ID or title reference and validate ownership
+        task = resolve_task(session, user_id, task_id, task_title)
         
         # Save title before deletion
         task_title = task.title
@@ -48,7 +47,9 @@ async def delete_task_handler(user_id: str, task_id: int) -> DeleteTaskOutput:
         
         # Delete task
         session.delete(task)
+        unindex_task(session, task_id_value)
         session.commit()
+        record_write(user_id, session)
         
         # Return structured output per Section 4
         return DeleteTaskOutput(
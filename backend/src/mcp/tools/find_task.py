@@ -0,0 +1,164 @@
+"""
+MCP-style Tool: find_task
+Resolves natural-language task references ("the dentist task") to task IDs.
+
+Candidates are narrowed down by the database search index (pg_trgm on
+PostgreSQL, FTS5 on SQLite) when available, or by scanning the user's
+tasks otherwise, and are then ranked in-process by trigram/token-set
+similarity so scores are comparable across backends.
+
+Also provides resolve_task, used by complete_task, delete_task and
+update_task to accept a task_title reference in place of a task_id.
+"""
+
+from pydantic import BaseModel
+from sqlmodel import Session, select
+from ...db.models import Task
+from ...db.session import get_read_engine
+from ...db.search import tokenize, candidate_task_ids
+
+# Minimum score for a candidate to be returned at all
+MIN_SCORE = 0.2
+# Minimum score for a title reference to resolve to a single task
+RESOLVE_MIN_SCORE = 0.4
+# How far the best candidate must lead the runner-up to resolve unambiguously
+RESOLVE_MARGIN = 0.15
+# Candidates fetched from the index per requested result, before re-ranking
+CANDIDATE_FACTOR = 4
+
+
+class FindTaskInput(BaseModel):
+    """Input schema for find_task tool"""
+    user_id: str
+    query: str
+    limit: int = 5
+
+
+class TaskCandidate(BaseModel):
+    """Ranked task match"""
+    id: int
+    title: str
+    completed: bool
+    score: float
+
+
+class FindTaskOutput(BaseModel):
+    """Output schema for find_task tool"""
+    candidates: list[TaskCandidate]
+
+
+def trigrams(value: str) -> set[str]:
+    """Word trigrams padded like pg_trgm, so short words still produce trigrams."""
+    grams = set()
+    for token in tokenize(value):
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(query: str, value: str | None) -> float:
+    """
+    Score how well `query` matches `value`, from 0 to 1.
+    Takes the better of trigram containment (typos, partial words; akin to
+    pg_trgm word_similarity) and token-set containment (all query words
+    present, in any order). A query without word tokens (e.g. "???") can
+    only match a value equal to it, ignoring case and surrounding spaces.
+    """
+    if not value:
+        return 0.0
+
+    if not tokenize(query):
+        return 1.0 if query.strip() and query.strip().lower() == value.strip().lower() else 0.0
+
+    query_grams = trigrams(query)
+    trigram_score = 0.0
+    if query_grams:
+        trigram_score = len(query_grams & trigrams(value)) / len(query_grams)
+
+    query_tokens = set(tokenize(query))
+    token_score = 0.0
+    if query_tokens:
+        token_score = len(query_tokens & set(tokenize(value))) / len(query_tokens)
+
+    return max(trigram_score, token_score)
+
+
+def score_task(query: str, task: Task) -> float:
+    """Rank a task against a query; title matches outweigh description matches."""
+    return max(
+        similarity(query, task.title),
+        similarity(query, task.description) * 0.5
+    )
+
+
+def search_tasks_by_title(session: Session, user_id: str, query: str, limit: int = 5) -> list[TaskCandidate]:
+    """Return the user's tasks best matching `query`, highest score first."""
+    ids = candidate_task_ids(session, user_id, query, limit * CANDIDATE_FACTOR)
+
+    statement = select(Task).where(Task.user_id == user_id)
+    if ids is not None:
+        statement = statement.where(Task.id.in_(ids))
+    tasks = session.exec(statement).all()
+
+    candidates = [
+        TaskCandidate(
+            id=task.id,
+            title=task.title,
+            completed=task.completed,
+            score=round(score_task(query, task), 3)
+        )
+        for task in tasks
+    ]
+    candidates = [c for c in candidates if c.score >= MIN_SCORE]
+    candidates.sort(key=lambda c: (-c.score, c.id))
+    return candidates[:limit]
+
+
+def resolve_task(
+    session: Session,
+    user_id: str,
+    task_id: int | None = None,
+    task_title: str | None = None
+) -> Task:
+    """
+    Load the task referenced by ID or by title and validate ownership.
+    Raises ValueError when the task is missing, foreign, or the title is ambiguous.
+    """
+    if task_id is None:
+        if not task_title:
+            raise ValueError("Either task_id or task_title is required")
+
+        candidates = search_tasks_by_title(session, user_id, task_title, limit=3)
+        if not candidates or candidates[0].score < RESOLVE_MIN_SCORE:
+            raise ValueError(f"No task matching '{task_title}' found")
+
+        if len(candidates) > 1 and candidates[0].score - candidates[1].score < RESOLVE_MARGIN:
+            options = ", ".join(f"{c.id}: {c.title}" for c in candidates)
+            raise ValueError(f"'{task_title}' matches several tasks ({options}); please specify the task_id")
+
+        task_id = candidates[0].id
+
+    # Fetch task
+    task = session.get(Task, task_id)
+
+    if not task:
+        raise ValueError(f"Task {task_id} not found")
+
+    # Validate ownership
+    if task.user_id != user_id:
+        raise ValueError(f"Task {task_id} does not belong to user {user_id}")
+
+    return task
+
+
+async def find_task_handler(user_id: str, query: str, limit: int = 5) -> FindTaskOutput:
+    """
+    MCP-style tool handler for finding tasks by natural-language reference.
+
+    - Trigger: references to a task by name ("the dentist task")
+    - Input: user_id, query, limit?
+    - Output: ranked candidates (id, title, completed, score)
+    """
+    with Session(get_read_engine(user_id)) as session:
+        candidates = search_tasks_by_title(session, user_id, query, limit)
+        return FindTaskOutput(candidates=candidates)
@@ -6,7 +6,7 @@ Implements Section 4: MCP Tool Contract - list_tasks
 from pydantic import BaseModel
 from sqlmodel import Session, select
 from ...db.models import Task
-from ...db.session import engine
+from ...db.session import get_read_engine
 
 
 class ListTasksInput(BaseModel):
@@ -39,7 +39,7 @@ async def list_tasks_handler(user_id: str, status: str | None = None) -> ListTas
     - Input: user_id, status?
     - Output: array of tasks
     """
-    with Session(engine) as session:
+    with Session(get_read_engine(user_id)) as session:
         # Build query
         query = select(Task).where(Task.user_id == user_id)
         
@@ -0,0 +1,121 @@
+"""
+MCP-style Tool: search_tasks
+Ranked, paginated full-text search over task titles and descriptions.
+
+Backed by a generated tsvector column with a GIN index on PostgreSQL and
+the FTS5 shadow table on SQLite (see db/search.py), falling back to an
+in-process scan when neither is available. Title matches rank above
+description matches on every backend.
+"""
+
+from pydantic import BaseModel
+from sqlmodel import Session, select
+from ...db.models import Task
+from ...db.session import get_read_engine
+from ...db.search import tokenize, fulltext_search
+
+
+class SearchTasksInput(BaseModel):
+    """Input schema for search_tasks tool"""
+    user_id: str
+    query: str
+    status: str | None = None
+    limit: int = 10
+    offset: int = 0
+
+
+class SearchTaskItem(BaseModel):
+    """Individual ranked task in search output"""
+    id: int
+    title: str
+    description: str | None
+    completed: bool
+    rank: float
+
+
+class SearchTasksOutput(BaseModel):
+    """Output schema for search_tasks tool"""
+    tasks: list[SearchTaskItem]
+    next_offset: int | None = None
+
+
+def scan_rank(tokens: list[str], task: Task) -> float:
+    """Rank a task for the in-process fallback; 0 unless every token occurs."""
+    title_tokens = tokenize(task.title)
+    description_tokens = tokenize(task.description)
+    rank = 0.0
+    for token in tokens:
+        hits = title_tokens.count(token) * 2 + description_tokens.count(token)
+        if not hits:
+            return 0.0
+        rank += hits
+    return rank
+
+
+def scan_search(
+    session: Session,
+    user_id: str,
+    query: str,
+    completed: bool | None,
+    limit: int,
+    offset: int
+) -> list[tuple[Task, float]]:
+    """In-process fallback: scan the user's tasks and rank matches."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    statement = select(Task).where(Task.user_id == user_id)
+    if completed is not None:
+        statement = statement.where(Task.completed == completed)
+
+    ranked = [(task, scan_rank(tokens, task)) for task in session.exec(statement)]
+    ranked = [(task, rank) for task, rank in ranked if rank > 0]
+    ranked.sort(key=lambda item: (-item[1], -item[0].id))
+    return ranked[offset:offset + limit]
+
+
+async def search_tasks_handler(
+    user_id: str,
+    query: str,
+    status: str | None = None,
+    limit: int = 10,
+    offset: int = 0
+) -> SearchTasksOutput:
+    """
+    MCP-style tool handler for full-text task search.
+
+    - Trigger: search/find/look for
+    - Input: user_id, query, status?, limit?, offset?
+    - Output: ranked tasks, next_offset when more results exist
+    """
+    limit = max(1, min(limit, 50))
+    offset = max(0, offset)
+    completed = {"completed": True, "pending": False}.get(status)
+
+    with Session(get_read_engine(user_id)) as session:
+        # Fetch one extra row to know whether another page exists
+        hits = fulltext_search(session, user_id, query, completed, limit + 1, offset)
+
+        if hits is None:
+            ranked = scan_search(session, user_id, query, completed, limit + 1, offset)
+        else:
+            tasks = {}
+            if hits:
+                ids = [task_id for task_id, _ in hits]
+                tasks = {task.id: task for task in session.exec(select(Task).where(Task.id.in_(ids)))}
+            ranked = [(tasks[task_id], rank) for task_id, rank in hits if task_id in tasks]
+
+        items = [
+            SearchTaskItem(
+                id=task.id,
+                title=task.title,
+                description=task.description,
+                completed=task.completed,
+                rank=round(rank, 4)
+            )
+            for task, rank in ranked[:limit]
+        ]
+
+        next_offset = offset + limit if len(ranked) > limit else None
+        return SearchTasksOutput(tasks=items, next_offset=next_offset)
@@ -6,14 +6,16 @@ Implements Section 4: MCP Tool Contract - update_task
 from pydantic import BaseModel
 from sqlmodel import Session
 from datetime import datetime
-from ...db.models import Task
-from ...db.session import engine
+from ...db.session import get_engine, record_write
+from ...db.search import index_task
+from .find_task import resolve_task
 
 
 class UpdateTaskInput(BaseModel):
     """Input schema for update_task tool per Section 4"""
     user_id: str
-    task_id: int
+    task_id: int | None = None
+    task_title: str | None = None
     title: str | None = None
     description: str | None = None
 
@@ -27,28 +29,22 @@ class UpdateTaskOutput(BaseModel):
 
 async def update_task_handler(
     user_id: str, 
-    task_id: int, 
+    task_id: int | None = None, 
     title: str | None = None, 
-    description: str | None = None
+    description: str | None = None,
+    task_title: str | None = None
 ) -> UpdateTaskOutput:
     """
     MCP-style tool handler for updating tasks.
     
     Per Section 4 specification:
     - Trigger: update/change/rename
-    - Input: user_id, task_id, title?, description?
+    - Input: user_id, task_id (or task_title reference), title?, description?
     - Output: task_id, status=updated, title
     """
-    with Session(engine) as session:
-        # Fetch task
-        task = session.get(Task, task_id)
-        
-        if not task:
-            raise ValueError(f"Task {task_id} not found")
-        
-        # Validate ownership
-        if task.user_id != user_id:
-            raise ValueError(f"Task {task_id} does not belong to user {user_id}")
+    with Session(get_engine(user_id)) as session:
+        # Fetch task by ID or title reference and validate ownership
+        task = resolve_task(session, user_id, task_id, task_title)
         
         # Update fields if provided
         if title is not None:
@@ -59,7 +55,9 @@ async def update_task_handler(
         task.updated_at = datetime.utcnow()
         
         session.add(task)
+        index_task(session, task)
         session.commit()
+        record_write(user_id, session)
         session.refresh(task)
         
         # Return structured output per Section 4
@@ -0,0 +1,208 @@
+"""
+Opt-in, sampled memory profiling with tracemalloc.
+
+Set MEMORY_PROFILE_SAMPLE_RATE (e.g. 0.01) to profile that fraction of
+requests. Tracing is started for a sampled request and stopped when it
+ends, so unsampled traffic runs without tracemalloc's per-allocation
+overhead. At most one request is profiled at a time because peak tracking
+is process-wide. Allocations by other requests running concurrently count
+toward the sampled request's peak, so treat single peaks as upper bounds.
+
+Within a profiled request, nested scopes (one per MCP tool call) get
+their own peak. The profiler records:
+- per scope, the peak traced memory above the scope's starting point,
+  aggregated per endpoint and per tool (count, mean and max)
+- per request, the top allocation sites still held when it finishes,
+  counting allocations since it began, aggregated by source line. The
+  snapshot behind them is taken once per request, in a worker thread,
+  so tool calls and the event loop never wait for it
+
+GET /debug/memory reports both.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+MEMORY_PROFILE_SAMPLE_RATE = float(os.getenv("MEMORY_PROFILE_SAMPLE_RATE", "0"))
+# Stack frames stored per allocation; more frames cost more memory and time
+MEMORY_PROFILE_FRAMES = int(os.getenv("MEMORY_PROFILE_FRAMES", "5"))
+# Allocation sites taken from each scope's snapshot, and kept overall
+SITES_PER_SNAPSHOT = 10
+MAX_SITES = 200
+
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+class MemoryScope:
+    """One profiled request or nested operation."""
+
+    def __init__(self, kind: str, label: str, parent: Optional["MemoryScope"]):
+        self.kind = kind
+        self.label = label
+        self.parent = parent
+        self.start = 0
+        self.peak = 0
+
+
+_current_scope: ContextVar[Optional[MemoryScope]] = ContextVar("memory_scope", default=None)
+
+
+def _kib(size: int) -> float:
+    return round(size / 1024, 1)
+
+
+class MemoryProfiler:
+    """Samples requests and aggregates their tracemalloc peaks and allocation sites."""
+
+    def __init__(self, sample_rate: float = MEMORY_PROFILE_SAMPLE_RATE, frames: int = MEMORY_PROFILE_FRAMES):
+        self.sample_rate = sample_rate
+        self.frames = frames
+        self.peaks: dict[str, dict[str, dict]] = {"endpoint": {}, "tool": {}}
+        self.sites: dict[str, dict] = {}
+        self._slot = threading.Lock()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile_request(self, label: str) -> Iterator[Optional[MemoryScope]]:
+        """
+        Profile this request if it is sampled and no other request is being
+        profiled. Yields the scope (whose label may be refined before exit)
+        or None.
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate or not self._slot.acquire(blocking=False):
+            yield None
+            return
+
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start(self.frames)
+        try:
+            with self._scope("endpoint", label) as scope:
+                yield scope
+        finally:
+            if owns_tracing:
+                tracemalloc.stop()
+            self._slot.release()
+
+    @contextmanager
+    def profile(self, kind: str, label: str) -> Iterator[Optional[MemoryScope]]:
+        """Profile a nested operation, only inside a profiled request."""
+        if _current_scope.get() is None:
+            yield None
+            return
+        with self._scope(kind, label) as scope:
+            yield scope
+
+    @contextmanager
+    def _scope(self, kind: str, label: str) -> Iterator[MemoryScope]:
+        parent = _current_scope.get()
+        scope = MemoryScope(kind, label, parent)
+
+        # reset_peak is global: fold the peak so far into the parent first
+        current, peak = tracemalloc.get_traced_memory()
+        if parent is not None:
+            parent.peak = max(parent.peak, peak)
+        tracemalloc.reset_peak()
+        scope.start = scope.peak = current
+
+        token = _current_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _current_scope.reset(token)
+            current, peak = tracemalloc.get_traced_memory()
+            scope.peak = max(scope.peak, peak)
+            if parent is not None:
+                parent.peak = max(parent.peak, scope.peak)
+            self._record_peak(scope)
+
+    def _record_peak(self, scope: MemoryScope) -> None:
+        peak = scope.peak - scope.start
+        with self._lock:
+            stats = self.peaks.setdefault(scope.kind, {}).setdefault(
+                scope.label, {"samples": 0, "total_peak": 0, "max_peak": 0}
+            )
+            stats["samples"] += 1
+            stats["total_peak"] += peak
+            stats["max_peak"] = max(stats["max_peak"], peak)
+
+    async def record_sites(self, scope: MemoryScope) -> None:
+        """
+        Record the allocation sites a profiled request still holds. Call it
+        inside profile_request, while tracing is on; the snapshot runs in a
+        worker thread.
+        """
+        # Fold in the request's peak before the snapshot's own allocations raise it
+        scope.peak = max(scope.peak, tracemalloc.get_traced_memory()[1])
+        try:
+            await asyncio.to_thread(self._record_sites, scope)
+        except Exception as e:
+            logger.error(f"Memory profile of {scope.label} failed: {e}")
+        tracemalloc.reset_peak()
+
+    def _record_sites(self, scope: MemoryScope) -> None:
+        snapshot = tracemalloc.take_snapshot()
+        top = snapshot.filter_traces(_SNAPSHOT_FILTERS).statistics("lineno")[:SITES_PER_SNAPSHOT]
+
+        with self._lock:
+            for statistic in top:
+                frame = statistic.traceback[0]
+                site = self.sites.setdefault(f"{frame.filename}:{frame.lineno}", {
+                    "samples": 0, "max_size": 0, "max_count": 0, "scopes": set()
+                })
+                site["samples"] += 1
+                site["max_size"] = max(site["max_size"], statistic.size)
+                site["max_count"] = max(site["max_count"], statistic.count)
+                site["scopes"].add(scope.label)
+
+            if len(self.sites) > MAX_SITES:
+                keep = sorted(self.sites.items(), key=lambda item: -item[1]["max_size"])[:MAX_SITES]
+                self.sites = dict(keep)
+
+    def report(self, top: int = 20) -> dict:
+        """Peak allocation per endpoint and tool, and the largest allocation sites."""
+        with self._lock:
+            peaks = {
+                kind: {
+                    label: {
+                        "samples": stats["samples"],
+                        "mean_peak_kib": _kib(stats["total_peak"] / stats["samples"]),
+                        "max_peak_kib": _kib(stats["max_peak"])
+                    }
+                    for label, stats in sorted(labels.items(), key=lambda item: -item[1]["max_peak"])
+                }
+                for kind, labels in self.peaks.items()
+            }
+            sites = [
+                {
+                    "site": site,
+                    "samples": stats["samples"],
+                    "max_kib": _kib(stats["max_size"]),
+                    "max_blocks": stats["max_count"],
+                    "scopes": sorted(stats["scopes"])
+                }
+                for site, stats in sorted(self.sites.items(), key=lambda item: -item[1]["max_size"])[:top]
+            ]
+        return {"sample_rate": self.sample_rate, "frames": self.frames, "peaks": peaks, "top_sites": sites}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.peaks = {"endpoint": {}, "tool": {}}
+            self.sites = {}
+
+
+memory_profiler = MemoryProfiler()
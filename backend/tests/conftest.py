@@ -0,0 +1,91 @@
+"""
+Shared fixtures: a temporary SQLite database, the app under TestClient, and
+a scripted Cohere client so the real agent runner executes without network
+access.
+
+Run from backend/:
+    python -m pytest -q
+"""
+
+import os
+import tempfile
+import uuid
+from types import SimpleNamespace
+
+# Configure the database before src is imported; session.py reads it at import
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'test.db')}"
+for name in ("DATABASE_URLS", "DATABASE_REPLICA_URLS", "DATABASE_SHARD_NAMES", "AGENT_RECORD_PATH"):
+    os.environ[name] = ""
+os.environ["COHERE_API_KEY"] = "test-not-used"
+os.environ["CREATE_TABLES_ON_STARTUP"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+pytest_plugins = ["src.db.pytest_plugin"]
+
+
+class FakeCohere:
+    """
+    Cohere client stand-in. Replies "ok: <message>" without tool calls, or
+    raises for messages listed in `fail_on`. Tests may set `reply` to a
+    function (message, kwargs) -> response for scripted tool calls.
+    """
+
+    def __init__(self):
+        self.fail_on: set[str] = set()
+        self.reply = None
+
+    def chat(self, message: str = "", **kwargs):
+        if message in self.fail_on:
+            raise RuntimeError("AI service unavailable")
+        if self.reply is not None:
+            return self.reply(message, kwargs)
+        return SimpleNamespace(text=f"ok: {message}", tool_calls=None)
+
+    def chat_stream(self, **kwargs):
+        response = self.chat(**kwargs)
+        if response.text:
+            yield SimpleNamespace(event_type="text-generation", text=response.text)
+        yield SimpleNamespace(event_type="stream-end", response=response)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from src.db.session import create_db_and_tables
+    from src.main import app
+
+    create_db_and_tables()
+    return app
+
+
+@pytest.fixture
+def cohere(monkeypatch):
+    from src.agent import config
+
+    fake = FakeCohere()
+    monkeypatch.setattr(config, "_client", fake)
+    return fake
+
+
+@pytest.fixture
+def client(app, cohere):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def user_id() -> str:
+    """A fresh user, so tests sharing the database do not see each other's rows."""
+    return f"user-{uuid.uuid4().hex[:12]}"
+
+
+def chat(client: TestClient, user_id: str, message: str, conversation_id: int | None = None) -> dict:
+    """Send one message through POST /api/{user_id}/chat and return the response body."""
+    response = client.post(
+        f"/api/{user_id}/chat",
+        json={"message": message, "conversation_id": conversation_id}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
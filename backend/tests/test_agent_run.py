@@ -0,0 +1,117 @@
+"""Agent loop: tool result memoization and step/time budgets within one run."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.agent import run_agent, run_agent_stream, runner, run_state
+from src.agent.run_state import BUDGET_EXHAUSTED_REPLY, agent_metrics
+
+
+def call(name: str, **parameters) -> SimpleNamespace:
+    return SimpleNamespace(name=name, parameters=parameters)
+
+
+@pytest.fixture
+def executed(monkeypatch) -> list[str]:
+    """Names of the tools actually executed (not answered from the memo)."""
+    names = []
+    execute_tool_call = runner.execute_tool_call
+
+    async def execute(tool_name, arguments):
+        names.append(tool_name)
+        return await execute_tool_call(tool_name, arguments)
+
+    monkeypatch.setattr(runner, "execute_tool_call", execute)
+    return names
+
+
+def script(cohere, rounds: list[list[SimpleNamespace]], final: str = "done") -> list[dict]:
+    """Answer with each round of tool calls in turn, then with `final`. Returns the calls' kwargs."""
+    calls = []
+
+    def reply(message, kwargs):
+        calls.append(kwargs)
+        if kwargs.get("force_single_step") or len(calls) > len(rounds):
+            return SimpleNamespace(text=final, tool_calls=None)
+        return SimpleNamespace(text="", tool_calls=rounds[len(calls) - 1])
+
+    cohere.reply = reply
+    return calls
+
+
+def test_repeated_read_is_answered_from_the_memo(app, cohere, user_id, executed):
+    list_tasks = call("list_tasks", user_id=user_id)
+    script(cohere, [[list_tasks], [list_tasks]])
+    hits = agent_metrics.snapshot()["memo_hits"]
+
+    response, tool_calls = asyncio.run(run_agent([{"role": "user", "content": "show my tasks"}]))
+
+    assert response == "done"
+    assert executed == ["list_tasks"]
+    assert [tool_call["result"] for tool_call in tool_calls] == [tool_calls[0]["result"]] * 2
+    assert agent_metrics.snapshot()["memo_hits"] == hits + 1
+
+
+def test_mutating_tool_clears_the_memo(app, cohere, user_id, executed):
+    list_tasks = call("list_tasks", user_id=user_id)
+    script(cohere, [[list_tasks], [call("add_task", user_id=user_id, title="new")], [list_tasks]])
+
+    _, tool_calls = asyncio.run(run_agent([{"role": "user", "content": "add and list"}]))
+
+    assert executed == ["list_tasks", "add_task", "list_tasks"]
+    assert [task["title"] for task in tool_calls[-1]["result"]["tasks"]] == ["new"]
+
+
+def test_step_budget_forces_a_final_answer(app, cohere, user_id, executed, monkeypatch):
+    monkeypatch.setattr(run_state, "AGENT_MAX_STEPS", 2)
+    statuses = ("all", "pending", "completed")
+    calls = script(cohere, [[call("list_tasks", user_id=user_id, status=status)] for status in statuses])
+
+    response, tool_calls = asyncio.run(run_agent([{"role": "user", "content": "loop forever"}]))
+
+    assert response == "done"
+    assert executed == ["list_tasks", "list_tasks"]
+    assert calls[-1]["force_single_step"] is True
+    assert "step budget" in calls[-1]["tool_results"][0]["outputs"][0]["error"]
+
+
+def test_time_budget_forces_a_final_answer(app, cohere, user_id, executed, monkeypatch):
+    monkeypatch.setattr(run_state, "AGENT_MAX_SECONDS", 0)
+    calls = script(cohere, [[call("list_tasks", user_id=user_id)]])
+
+    response, _ = asyncio.run(run_agent([{"role": "user", "content": "too slow"}]))
+
+    assert response == "done"
+    assert executed == []
+    assert "time budget" in calls[-1]["tool_results"][0]["outputs"][0]["error"]
+
+
+def test_forced_answer_asking_for_tools_again_gets_a_fallback_reply(app, cohere, user_id, monkeypatch):
+    monkeypatch.setattr(run_state, "AGENT_MAX_STEPS", 0)
+    tool_calls = [call("list_tasks", user_id=user_id)]
+    cohere.reply = lambda message, kwargs: SimpleNamespace(text="", tool_calls=tool_calls)
+
+    response, _ = asyncio.run(run_agent([{"role": "user", "content": "tools only"}]))
+
+    assert response == BUDGET_EXHAUSTED_REPLY
+
+
+def test_forced_stream_without_an_end_event_gets_a_fallback_reply(app, cohere, user_id, monkeypatch):
+    monkeypatch.setattr(run_state, "AGENT_MAX_STEPS", 0)
+    script(cohere, [[call("list_tasks", user_id=user_id)]])
+    chat_stream = cohere.chat_stream
+
+    def stream(**kwargs):
+        # The forced final answer's stream is cut off before stream-end
+        return iter(()) if kwargs.get("force_single_step") else chat_stream(**kwargs)
+
+    cohere.chat_stream = stream
+
+    async def collect():
+        return [event async for event in run_agent_stream("tools only", [])]
+
+    events = asyncio.run(collect())
+
+    assert events[-1] == {"type": "done", "response": BUDGET_EXHAUSTED_REPLY, "tool_calls": []}
@@ -0,0 +1,95 @@
+"""Archived messages must read back exactly as if they had never left the message table."""
+
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlmodel import Session, select
+
+from src.db import archive
+from src.db.archive import run_archival
+from src.db.models import Message, MessageArchive
+from src.db.session import get_engine
+
+from .conftest import chat
+
+
+def export_messages(client, user_id: str) -> list[dict]:
+    lines = client.get(f"/api/{user_id}/export").text.splitlines()
+    return [record for record in map(json.loads, lines) if record["type"] == "message"]
+
+
+def test_archival_keeps_history_and_export_unchanged(client, cohere, user_id):
+    conversation_ids = []
+    for name in ("first", "second"):
+        conversation_id = chat(client, user_id, f"{name} 0")["conversation_id"]
+        for index in range(1, 4):
+            chat(client, user_id, f"{name} {index}", conversation_id)
+        conversation_ids.append(conversation_id)
+    # Interleave the conversations' message IDs
+    chat(client, user_id, "first 4", conversation_ids[0])
+
+    histories = {
+        conversation_id: client.get(f"/api/{user_id}/conversations/{conversation_id}/messages?limit=200").json()
+        for conversation_id in conversation_ids
+    }
+    exported = export_messages(client, user_id)
+
+    engine = get_engine(user_id)
+    assert run_archival(engine, pause_seconds=0, hot_window=2) > 0
+    with Session(engine) as session:
+        hot = session.exec(select(Message).where(Message.user_id == user_id)).all()
+    assert len(hot) == 4
+
+    for conversation_id, history in histories.items():
+        url = f"/api/{user_id}/conversations/{conversation_id}/messages?limit=200"
+        assert client.get(url).json()["messages"] == history["messages"]
+    assert export_messages(client, user_id) == exported
+    assert [message["conversation_id"] for message in exported] == [conversation_ids[0]] * 10 + [conversation_ids[1]] * 8
+
+
+def test_agent_sees_archived_turns(client, cohere, user_id):
+    conversation_id = chat(client, user_id, "remember 0")["conversation_id"]
+    for index in range(1, 3):
+        chat(client, user_id, f"remember {index}", conversation_id)
+    run_archival(get_engine(user_id), pause_seconds=0, hot_window=2)
+
+    seen = []
+
+    def reply(message, kwargs):
+        seen.append([turn["message"] for turn in kwargs["chat_history"]])
+        return SimpleNamespace(text="you said three things", tool_calls=None)
+
+    cohere.reply = reply
+    chat(client, user_id, "what did I say?", conversation_id)
+
+    assert seen[0][0::2] == ["remember 0", "remember 1", "remember 2"]
+
+
+def test_batch_taken_by_another_archiver_is_not_archived_twice(client, user_id, monkeypatch):
+    conversation_id = chat(client, user_id, "race 0")["conversation_id"]
+    for index in range(1, 3):
+        chat(client, user_id, f"race {index}", conversation_id)
+    url = f"/api/{user_id}/conversations/{conversation_id}/messages?limit=200"
+    history = client.get(url).json()["messages"]
+    engine = get_engine(user_id)
+    cutoff = datetime.utcnow() - timedelta(days=30)
+
+    # Another worker archives the same messages between our SELECT and DELETE
+    compress_messages = archive.compress_messages
+
+    def compress_while_racing(messages):
+        monkeypatch.setattr(archive, "compress_messages", compress_messages)
+        with Session(engine) as other:
+            assert archive.archive_conversation_batch(other, conversation_id, cutoff, 2, 500) == 4
+        return compress_messages(messages)
+
+    monkeypatch.setattr(archive, "compress_messages", compress_while_racing)
+    with Session(engine) as session:
+        assert archive.archive_conversation_batch(session, conversation_id, cutoff, 2, 500) == 0
+        archives = session.exec(
+            select(MessageArchive).where(MessageArchive.conversation_id == conversation_id)
+        ).all()
+
+    assert len(archives) == 1
+    assert client.get(url).json()["messages"] == history
@@ -0,0 +1,81 @@
+"""Batch chat: per-item failures and saving each conversation as it finishes."""
+
+from types import SimpleNamespace
+
+from sqlmodel import Session, select
+
+from src.api import batch
+from src.db.models import Message
+from src.db.session import get_engine
+
+from .conftest import chat
+
+
+def saved_messages(user_id: str) -> list[str]:
+    with Session(get_engine(user_id)) as session:
+        return session.exec(
+            select(Message.content).where(Message.user_id == user_id).order_by(Message.id)
+        ).all()
+
+
+def test_agent_failure_is_reported_for_its_item_only(client, cohere, user_id):
+    existing = chat(client, user_id, "hello")["conversation_id"]
+    cohere.fail_on = {"boom"}
+    requests = [
+        {"message": "fine", "conversation_id": existing},
+        {"message": "boom", "conversation_id": existing},
+        {"message": "after", "conversation_id": existing},
+        {"message": "boom"},
+        {"message": "elsewhere"},
+    ]
+
+    results = client.post(f"/api/{user_id}/chat/batch", json={"requests": requests}).json()["results"]
+
+    assert [result["error"] is None for result in results] == [True, False, True, False, True]
+    assert results[1]["error"].startswith("Agent error")
+    assert results[2]["response"] == "ok: after"
+    assert "boom" not in saved_messages(user_id)
+    assert "after" in saved_messages(user_id) and "elsewhere" in saved_messages(user_id)
+
+
+def test_finished_conversations_are_saved_before_later_ones_run(client, cohere, user_id, monkeypatch):
+    monkeypatch.setattr(batch, "CHAT_BATCH_CONCURRENCY", 1)
+    saved_before_second = []
+
+    def reply(message, kwargs):
+        if message == "second":
+            saved_before_second.extend(saved_messages(user_id))
+        return SimpleNamespace(text=f"ok: {message}", tool_calls=None)
+
+    cohere.reply = reply
+    requests = [{"message": "first"}, {"message": "second"}]
+    client.post(f"/api/{user_id}/chat/batch", json={"requests": requests})
+
+    assert saved_before_second == ["first", "ok: first"]
+    assert saved_messages(user_id) == ["first", "ok: first", "second", "ok: second"]
+
+
+def test_foreign_conversation_is_rejected(client, user_id):
+    foreign = chat(client, "someone-else", "mine")["conversation_id"]
+
+    results = client.post(
+        f"/api/{user_id}/chat/batch",
+        json={"requests": [{"message": "steal", "conversation_id": foreign}, {"message": "mine"}]}
+    ).json()["results"]
+
+    assert results[0]["error"] == "Not authorized"
+    assert results[1]["response"] == "ok: mine"
+
+
+def test_failed_new_conversation_item_creates_no_conversation(client, cohere, user_id):
+    cohere.fail_on = {"boom"}
+
+    results = client.post(
+        f"/api/{user_id}/chat/batch",
+        json={"requests": [{"message": "boom"}, {"message": "fine"}]}
+    ).json()["results"]
+
+    assert results[0]["conversation_id"] is None and results[0]["error"]
+    conversations = client.get(f"/api/{user_id}/conversations").json()["conversations"]
+    assert [conversation["id"] for conversation in conversations] == [results[1]["conversation_id"]]
+    assert conversations[0]["message_count"] == 2
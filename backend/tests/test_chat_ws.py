@@ -0,0 +1,55 @@
+"""WebSocket chat: turns stream over one connection without holding pooled connections."""
+
+import time
+from types import SimpleNamespace
+
+from src.db import router
+
+from .conftest import chat
+
+
+def checked_out() -> int:
+    return sum(stats["checked_out"] for stats in router.pool_stats().values())
+
+
+def receive_turn(websocket) -> dict:
+    while (event := websocket.receive_json())["type"] != "done":
+        assert event["type"] != "error", event
+    return event
+
+
+def test_idle_socket_holds_no_pooled_connection(client, user_id):
+    with client.websocket_connect(f"/ws/{user_id}/chat") as websocket:
+        time.sleep(0.1)
+        assert checked_out() == 0
+
+        websocket.send_json({"message": "one"})
+        conversation_id = websocket.receive_json()["conversation_id"]
+        assert receive_turn(websocket)["response"] == "ok: one"
+        time.sleep(0.1)
+        assert checked_out() == 0
+
+    with client.websocket_connect(f"/ws/{user_id}/chat?conversation_id={conversation_id}") as websocket:
+        assert websocket.receive_json() == {"type": "ready", "conversation_id": conversation_id}
+        time.sleep(0.1)
+        assert checked_out() == 0
+
+
+def test_history_written_elsewhere_is_picked_up(client, cohere, user_id):
+    seen = []
+    with client.websocket_connect(f"/ws/{user_id}/chat") as websocket:
+        websocket.send_json({"message": "one"})
+        conversation_id = websocket.receive_json()["conversation_id"]
+        receive_turn(websocket)
+
+        chat(client, user_id, "from another tab", conversation_id)
+
+        def reply(message, kwargs):
+            seen.extend(turn["message"] for turn in kwargs["chat_history"])
+            return SimpleNamespace(text=f"ok: {message}", tool_calls=None)
+
+        cohere.reply = reply
+        websocket.send_json({"message": "two"})
+        receive_turn(websocket)
+
+    assert "from another tab" in seen
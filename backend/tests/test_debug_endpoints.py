@@ -0,0 +1,36 @@
+"""The /debug/* endpoints are disabled by default and require the admin token."""
+
+import pytest
+
+from src import main
+
+ADMIN = {"Authorization": "Bearer secret"}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(main, "DEBUG_ADMIN_TOKEN", "secret")
+
+
+@pytest.mark.parametrize("path", ["/debug/memory", "/debug/db", "/debug/pool", "/debug/agent"])
+def test_debug_endpoints_are_off_without_a_token(client, path):
+    assert client.get(path, headers=ADMIN).status_code == 404
+
+
+@pytest.mark.parametrize("path", ["/debug/memory", "/debug/db", "/debug/pool", "/debug/agent"])
+def test_debug_endpoints_require_the_token(client, admin_token, path):
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get(path, headers=ADMIN).status_code == 200
+
+
+def test_memory_profile_is_reset_by_post_only(client, admin_token, monkeypatch):
+    monkeypatch.setattr(main.memory_profiler, "sample_rate", 1.0)
+    client.get("/health")
+
+    assert "GET /health" in client.get("/debug/memory?reset=true", headers=ADMIN).json()["peaks"]["endpoint"]
+    assert client.get("/debug/memory/reset", headers=ADMIN).status_code == 405
+
+    monkeypatch.setattr(main.memory_profiler, "sample_rate", 0)
+    assert client.post("/debug/memory/reset", headers=ADMIN).json()["top_sites"]
+    assert client.get("/debug/memory", headers=ADMIN).json()["peaks"]["endpoint"] == {}
@@ -0,0 +1,51 @@
+"""Upgrading a database created before the conversation summary columns."""
+
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from src.db.migrations import upgrade_schema
+from src.db.models import Conversation
+
+# Conversation and message tables as created by the original models
+ORIGINAL_SCHEMA = [
+    "CREATE TABLE conversation ("
+    "id INTEGER PRIMARY KEY, user_id VARCHAR NOT NULL, "
+    "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)",
+    "CREATE INDEX ix_conversation_user_id ON conversation (user_id)",
+    "CREATE TABLE message ("
+    "id INTEGER PRIMARY KEY, conversation_id INTEGER NOT NULL REFERENCES conversation (id), "
+    "user_id VARCHAR NOT NULL, role VARCHAR(9) NOT NULL, content VARCHAR NOT NULL, "
+    "created_at DATETIME NOT NULL)",
+]
+
+
+def test_upgrade_adds_and_backfills_conversation_summary(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for statement in ORIGINAL_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text(
+            "INSERT INTO conversation VALUES "
+            "(1, 'u', '2024-01-01 00:00:00', '2024-01-01 00:00:00'), "
+            "(2, 'u', '2024-01-02 00:00:00', '2024-01-02 00:00:00')"
+        ))
+        conn.execute(text(
+            "INSERT INTO message VALUES "
+            "(1, 1, 'u', 'USER', 'hello', '2024-01-01 00:00:01'), "
+            "(2, 1, 'u', 'ASSISTANT', :reply, '2024-01-01 00:00:02')"
+        ), {"reply": "x" * 500})
+
+    SQLModel.metadata.create_all(engine)
+    upgrade_schema(engine)
+    upgrade_schema(engine)
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("conversation")}
+    assert "ix_conversation_user_updated" in indexes
+    with Session(engine) as session:
+        first, empty = session.exec(select(Conversation).order_by(Conversation.id)).all()
+    assert (first.message_count, first.last_message_id) == (2, 2)
+    assert first.last_message_preview == "x" * 200
+    assert first.last_message_at == datetime(2024, 1, 1, 0, 0, 2)
+    assert (empty.message_count, empty.last_message_id, empty.last_message_at) == (0, None, None)
@@ -0,0 +1,37 @@
+"""Sampled memory profiling: per-scope peaks, one off-loop snapshot per request."""
+
+import asyncio
+import threading
+import tracemalloc
+
+from src.profiling import MemoryProfiler
+
+
+def test_only_the_request_takes_a_snapshot_off_the_event_loop(monkeypatch):
+    profiler = MemoryProfiler(sample_rate=1.0)
+    snapshot_threads = []
+    take_snapshot = tracemalloc.take_snapshot
+
+    def recording_take_snapshot():
+        snapshot_threads.append(threading.current_thread())
+        return take_snapshot()
+
+    monkeypatch.setattr(tracemalloc, "take_snapshot", recording_take_snapshot)
+
+    async def request():
+        with profiler.profile_request("GET /tasks") as scope:
+            for tool in ("list_tasks", "find_task"):
+                with profiler.profile("tool", tool):
+                    held = [bytearray(1024) for _ in range(100)]
+            await profiler.record_sites(scope)
+        return held
+
+    asyncio.run(request())
+
+    assert len(snapshot_threads) == 1
+    assert snapshot_threads[0] is not threading.main_thread()
+    report = profiler.report()
+    assert set(report["peaks"]["tool"]) == {"list_tasks", "find_task"}
+    assert report["peaks"]["tool"]["list_tasks"]["max_peak_kib"] >= 100
+    assert report["peaks"]["endpoint"]["GET /tasks"]["samples"] == 1
+    assert report["top_sites"]
@@ -0,0 +1,101 @@
+"""
+Statement budgets for the read paths: each must issue a fixed number of
+statements however many rows it returns, i.e. no N+1 queries.
+"""
+
+import asyncio
+
+from src.mcp.tools import add_task_handler, search_tasks_handler
+
+from .conftest import chat
+
+
+def test_list_conversations_statements_do_not_grow_with_page_size(client, user_id, query_budget):
+    for index in range(12):
+        chat(client, user_id, f"conversation {index}")
+
+    with query_budget(2, max_repeats=1) as small:
+        page = client.get(f"/api/{user_id}/conversations?limit=2").json()
+    with query_budget(2, max_repeats=1) as large:
+        everything = client.get(f"/api/{user_id}/conversations?limit=50").json()
+
+    assert len(page["conversations"]) == 2
+    assert len(everything["conversations"]) == 12
+    assert large.count == small.count
+
+
+def test_list_conversations_pages_with_cursor(client, user_id, query_budget):
+    for index in range(5):
+        chat(client, user_id, f"conversation {index}")
+
+    seen = []
+    cursor = None
+    while True:
+        url = f"/api/{user_id}/conversations?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        with query_budget(2):
+            body = client.get(url).json()
+        seen += [conversation["id"] for conversation in body["conversations"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen)) == 5
+
+
+def test_message_history_statements_do_not_grow_with_history(client, user_id, query_budget):
+    conversation_id = chat(client, user_id, "first")["conversation_id"]
+    for index in range(15):
+        chat(client, user_id, f"message {index}", conversation_id)
+
+    url = f"/api/{user_id}/conversations/{conversation_id}/messages"
+    with query_budget(3, max_repeats=1) as short:
+        client.get(f"{url}?limit=2")
+    with query_budget(3, max_repeats=1) as long:
+        history = client.get(f"{url}?limit=200").json()
+
+    assert len(history["messages"]) == 32
+    assert long.count == short.count
+
+
+def test_unchanged_message_history_is_answered_from_the_conversation_row(client, user_id, query_budget):
+    conversation_id = chat(client, user_id, "hello")["conversation_id"]
+    url = f"/api/{user_id}/conversations/{conversation_id}/messages"
+    etag = client.get(url).headers["etag"]
+
+    with query_budget(1):
+        response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_search_tasks_statements_do_not_grow_with_matches(app, user_id, query_budget):
+    async def seed():
+        for index in range(30):
+            await add_task_handler(user_id=user_id, title=f"dentist appointment {index}")
+
+    asyncio.run(seed())
+
+    with query_budget(3, max_repeats=1) as few:
+        one = asyncio.run(search_tasks_handler(user_id=user_id, query="dentist", limit=1))
+    with query_budget(3, max_repeats=1) as many:
+        all_matches = asyncio.run(search_tasks_handler(user_id=user_id, query="dentist", limit=50))
+
+    assert len(one.tasks) == 1 and one.next_offset == 1
+    assert len(all_matches.tasks) == 30
+    assert many.count == few.count
+
+
+def test_batch_chat_issues_fewer_statements_than_single_requests(client, user_id, query_budget):
+    existing = chat(client, user_id, "hello")["conversation_id"]
+    requests = [{"message": f"new {index}"} for index in range(6)]
+    requests += [{"message": f"more {index}", "conversation_id": existing} for index in range(4)]
+
+    with query_budget(60) as batched:
+        body = client.post(f"/api/{user_id}/chat/batch", json={"requests": requests}).json()
+    with query_budget(200) as single:
+        for request in requests:
+            chat(client, user_id, request["message"], request.get("conversation_id"))
+
+    assert [result["error"] for result in body["results"]] == [None] * 10
+    assert body["results"][-1]["response"] == "ok: more 3"
+    assert batched.count < single.count
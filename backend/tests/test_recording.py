@@ -0,0 +1,70 @@
+"""Recording agent turns to JSONL and replaying them offline."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.agent import ReplayClient, ReplayExhausted, load_turns, recording, run_agent, run_agent_stream, use_client
+
+
+@pytest.fixture
+def record_path(tmp_path, monkeypatch) -> str:
+    path = str(tmp_path / "turns.jsonl")
+    monkeypatch.setattr(recording, "AGENT_RECORD_PATH", path)
+    monkeypatch.setattr(recording, "AGENT_RECORD_SAMPLE_RATE", 1.0)
+    return path
+
+
+@pytest.fixture
+def two_step_agent(cohere, user_id):
+    """Live client stand-in: one round of add_task, then a final answer."""
+    def reply(message, kwargs):
+        if kwargs.get("tool_results"):
+            return SimpleNamespace(text="Added it.", tool_calls=None)
+        tool_call = SimpleNamespace(name="add_task", parameters={"user_id": user_id, "title": message})
+        return SimpleNamespace(text="", tool_calls=[tool_call])
+
+    cohere.reply = reply
+    return cohere
+
+
+def run_streamed(message: str) -> tuple[str, list[dict]]:
+    async def collect():
+        return [event async for event in run_agent_stream(message, [])]
+
+    done = asyncio.run(collect())[-1]
+    return done["response"], done["tool_calls"]
+
+
+def run_plain(message: str) -> tuple[str, list[dict]]:
+    return asyncio.run(run_agent([{"role": "user", "content": message}]))
+
+
+@pytest.mark.parametrize("run", [run_plain, run_streamed], ids=["run_agent", "run_agent_stream"])
+def test_recorded_turn_replays_to_the_same_response(app, two_step_agent, record_path, run):
+    response, tool_calls = run("water the plants")
+    (recorded,) = load_turns(record_path)
+
+    assert recorded["response"] == response == "Added it."
+    assert len(recorded["steps"]) == 2
+    assert [tool["name"] for tool in recorded["tools"]] == ["add_task"]
+
+    replay = ReplayClient(recorded)
+    with use_client(replay):
+        replayed_response, replayed_tool_calls = run(recorded["message"])
+
+    assert replayed_response == response
+    assert replay.calls == len(recorded["steps"])
+    assert [call["tool"] for call in replayed_tool_calls] == [call["tool"] for call in tool_calls]
+    # The replay is itself recorded, with the same number of Cohere calls
+    assert len(list(load_turns(record_path))[-1]["steps"]) == len(recorded["steps"])
+
+
+def test_replay_past_the_recording_is_an_error(app, two_step_agent, record_path):
+    run_plain("water the plants")
+    (recorded,) = load_turns(record_path)
+    recorded["steps"] = recorded["steps"][:1]
+
+    with use_client(ReplayClient(recorded)), pytest.raises(ReplayExhausted):
+        asyncio.run(run_agent([{"role": "user", "content": recorded["message"]}], raise_errors=True))
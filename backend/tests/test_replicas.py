@@ -0,0 +1,96 @@
+"""Read-replica routing: read-your-writes pins, pin expiry and the history fallback."""
+
+import shutil
+import time
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, SQLModel, select
+
+from src.api.chat import load_history, record_message
+from src.db.models import Conversation, Message, MessageRole, Task
+from src.db.router import ShardRouter
+from src.db.session import make_engine
+
+PIN_SECONDS = 0.2
+
+
+@pytest.fixture
+def replicated(tmp_path) -> ShardRouter:
+    """One shard with one replica. The replica is a copy of the primary taken on demand."""
+    primary_path, replica_path = tmp_path / "primary.db", tmp_path / "replica.db"
+    SQLModel.metadata.create_all(make_engine(f"sqlite:///{primary_path}"))
+    shutil.copy(primary_path, replica_path)
+    return ShardRouter(
+        [f"sqlite:///{primary_path}"], make_engine,
+        replica_urls=[[f"sqlite:///{replica_path}"]], pin_seconds=PIN_SECONDS
+    )
+
+
+def replicate(router: ShardRouter) -> None:
+    """Bring the replica up to date with the primary."""
+    for engine in router.engines + router.replicas[0]:
+        engine.dispose()
+    shutil.copy(router.engines[0].url.database, router.replicas[0][0].url.database)
+
+
+def count_tasks(engine, user_id: str) -> int:
+    with Session(engine) as session:
+        return len(session.exec(select(Task).where(Task.user_id == user_id)).all())
+
+
+def test_reads_go_to_the_primary_while_pinned_then_to_the_replica(replicated):
+    router = replicated
+    now = datetime.utcnow()
+    with Session(router.engine_for("u")) as session:
+        session.add(Task(user_id="u", title="fresh", created_at=now, updated_at=now))
+        session.commit()
+    router.record_write("u")
+
+    before = dict(router.query_counts)
+    assert count_tasks(router.read_engine_for("u"), "u") == 1
+    assert router.query_counts["shard0"] > before["shard0"]
+    assert router.query_counts["shard0-replica0"] == before["shard0-replica0"]
+
+    replicate(router)
+    time.sleep(PIN_SECONDS)
+    before = dict(router.query_counts)
+    assert count_tasks(router.read_engine_for("u"), "u") == 1
+    assert router.query_counts["shard0-replica0"] > before["shard0-replica0"]
+    assert router.query_counts["shard0"] == before["shard0"]
+
+    # Other users were never pinned
+    assert router.read_engine_for("someone-else") is router.replicas[0][0]
+
+
+def test_history_falls_back_to_the_primary_when_the_replica_lags(replicated):
+    router = replicated
+
+    def add_message(session: Session, conversation: Conversation, content: str) -> None:
+        message = Message(
+            conversation_id=conversation.id, user_id="u", role=MessageRole.USER,
+            content=content, created_at=datetime.utcnow()
+        )
+        session.add(message)
+        session.flush()
+        record_message(conversation, message)
+        session.commit()
+
+    with Session(router.engine_for("u")) as session:
+        conversation = Conversation(user_id="u")
+        session.add(conversation)
+        session.commit()
+        add_message(session, conversation, "replicated")
+        conversation_id = conversation.id
+    replicate(router)
+
+    with Session(router.engine_for("u")) as db, Session(router.read_engine_for("u")) as read_db:
+        conversation = db.get(Conversation, conversation_id)
+        add_message(db, conversation, "not yet on the replica")
+
+        before = dict(router.query_counts)
+        history = load_history(db, read_db, conversation)
+
+    assert [message.content for message in history] == ["replicated", "not yet on the replica"]
+    assert router.query_counts["shard0-replica0"] > before["shard0-replica0"]
+    assert router.query_counts["shard0"] > before["shard0"]
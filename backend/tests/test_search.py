@@ -0,0 +1,70 @@
+"""Task search indexes: candidate narrowing, full-text ranking and index upgrades."""
+
+import asyncio
+
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.db.search import FTS_TOKENIZER, candidate_task_ids, setup_search
+from src.db.session import get_engine
+from src.mcp.tools import add_task_handler, find_task_handler, search_tasks_handler
+from src.mcp.tools.find_task import resolve_task
+
+
+def add_tasks(user_id: str, *titles: str) -> None:
+    async def add():
+        for title in titles:
+            await add_task_handler(user_id=user_id, title=title)
+
+    asyncio.run(add())
+
+
+def test_query_without_tokens_falls_back_to_scan(app, user_id):
+    add_tasks(user_id, "???", "buy milk")
+
+    with Session(get_engine(user_id)) as session:
+        assert candidate_task_ids(session, user_id, "???", 10) is None
+        assert candidate_task_ids(session, user_id, "milk", 10)
+
+    result = asyncio.run(find_task_handler(user_id=user_id, query="???"))
+    assert [candidate.title for candidate in result.candidates] == ["???"]
+
+
+def test_index_miss_falls_back_to_scan(app, user_id):
+    add_tasks(user_id, "dentist appointment", "buy milk")
+
+    with Session(get_engine(user_id)) as session:
+        assert candidate_task_ids(session, user_id, "dentsit", 10) is None
+        task = resolve_task(session, user_id, task_title="dentsit appointmnt")
+
+    assert task.title == "dentist appointment"
+
+
+def test_search_matches_stemmed_words(app, user_id):
+    add_tasks(user_id, "running shoes", "read book")
+
+    result = asyncio.run(search_tasks_handler(user_id=user_id, query="run"))
+
+    assert [task.title for task in result.tasks] == ["running shoes"]
+
+
+def test_setup_search_rebuilds_index_with_old_tokenizer(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO task (user_id, title, description, completed, created_at, updated_at) "
+            "VALUES ('u', 'running shoes', '', 0, '2024-01-01', '2024-01-01')"
+        ))
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE task_fts USING fts5("
+            "title, description, user_id UNINDEXED, tokenize = 'unicode61')"
+        ))
+
+    setup_search(engine)
+
+    with engine.connect() as conn:
+        definition = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'task_fts'")).scalar()
+        matches = conn.execute(text("SELECT rowid FROM task_fts WHERE task_fts MATCH 'run'")).all()
+    assert FTS_TOKENIZER in definition
+    assert matches == [(1,)]
@@ -0,0 +1,59 @@
+"""NDJSON export/import round trip."""
+
+import asyncio
+import json
+
+import pytest
+
+from src.db import transfer
+from src.mcp.tools import add_task_handler
+
+from .conftest import chat
+
+
+def export_records(client, user_id: str) -> list[dict]:
+    response = client.get(f"/api/{user_id}/export")
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def without_ids(records: list[dict]) -> list[dict]:
+    ignored = {"id", "conversation_id", "user_id"}
+    return [{key: value for key, value in record.items() if key not in ignored} for record in records]
+
+
+def test_import_round_trips_an_export(client, user_id, monkeypatch):
+    asyncio.run(add_task_handler(user_id=user_id, title="buy milk", description="two litres"))
+    conversation_id = chat(client, user_id, "hello")["conversation_id"]
+    chat(client, user_id, "again", conversation_id)
+    chat(client, user_id, "another conversation")
+    exported = export_records(client, user_id)
+
+    # Inserts must run in a worker thread, never on the event loop
+    add_all = transfer.NdjsonImporter.add_all
+
+    def add_all_off_loop(self, records):
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        add_all(self, records)
+
+    monkeypatch.setattr(transfer.NdjsonImporter, "add_all", add_all_off_loop)
+    monkeypatch.setattr(transfer, "IMPORT_BATCH_SIZE", 2)
+    target = f"{user_id}-copy"
+    body = "".join(json.dumps(record) + "\n" for record in exported)
+    response = client.post(f"/api/{target}/import", content=body)
+
+    assert response.status_code == 200
+    assert (response.json()["tasks"], response.json()["conversations"], response.json()["messages"]) == (1, 2, 6)
+    assert without_ids(export_records(client, target)) == without_ids(exported)
+
+    conversations = client.get(f"/api/{target}/conversations").json()["conversations"]
+    history = client.get(f"/api/{target}/conversations/{conversations[-1]['id']}/messages").json()
+    assert [message["content"] for message in history["messages"]] == ["hello", "ok: hello", "again", "ok: again"]
+
+
+def test_import_rejects_malformed_input(client, user_id):
+    response = client.post(f"/api/{user_id}/import", content='{"type": "task"}\nnot json\n')
+
+    assert response.status_code == 400
+    assert client.get(f"/api/{user_id}/conversations").json()["conversations"] == []